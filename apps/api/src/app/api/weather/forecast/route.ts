@@ -1,5 +1,14 @@
 import { NextRequest, NextResponse } from 'next/server';
 import axios from 'axios';
+import type {
+  WeatherForecast,
+  SolarForecast,
+  HourlyForecastPoint,
+  HourlyProductionAnalysis,
+} from '@repo/types';
+import { createLogger } from '../../../../services/logger';
+
+const logger = createLogger('weather/forecast');
 
 // Direct Open-Meteo API call for Agramunt, Spain
 const API_BASE_URL = 'https://api.open-meteo.com/v1/forecast';
@@ -9,106 +18,166 @@ const LOCATION = {
   name: 'Agramunt, Spain'
 };
 
+const RESPONSE_HEADERS = {
+  'Content-Type': 'application/json',
+  'Access-Control-Allow-Origin': '*',
+  'Access-Control-Allow-Methods': 'GET',
+  'Access-Control-Allow-Headers': 'Content-Type',
+};
+
+// Recent Open-Meteo responses keyed by forecast length
+const FORECAST_CACHE_TTL_MS = 15 * 60 * 1000; // 15 minutes
+const forecastCache = new Map<number, { expiresAt: number; forecast: PreparedForecast }>();
+
+// Open-Meteo WMO weather code descriptions
+const WEATHER_CODES: Record<number, string> = {
+  0: 'Clear sky',
+  1: 'Mainly clear',
+  2: 'Partly cloudy',
+  3: 'Overcast',
+  45: 'Fog',
+  48: 'Depositing rime fog',
+  51: 'Light drizzle',
+  53: 'Moderate drizzle',
+  55: 'Dense drizzle',
+  56: 'Light freezing drizzle',
+  57: 'Dense freezing drizzle',
+  61: 'Slight rain',
+  63: 'Moderate rain',
+  65: 'Heavy rain',
+  66: 'Light freezing rain',
+  67: 'Heavy freezing rain',
+  71: 'Slight snow fall',
+  73: 'Moderate snow fall',
+  75: 'Heavy snow fall',
+  77: 'Snow grains',
+  80: 'Slight rain showers',
+  81: 'Moderate rain showers',
+  82: 'Violent rain showers',
+  85: 'Slight snow showers',
+  86: 'Heavy snow showers',
+  95: 'Thunderstorm',
+  96: 'Thunderstorm with slight hail',
+  99: 'Thunderstorm with heavy hail',
+};
+
+// Typical-day analysis used when hourly data is missing or unusable
+// (shared by every response, so frozen down to the window entries)
+const FALLBACK_HOURLY_ANALYSIS: Readonly<HourlyProductionAnalysis> = Object.freeze({
+  production_start: 8,
+  production_end: 18,
+  peak_hour: 13,
+  optimal_windows: Object.freeze([
+    Object.freeze({ start: 11, end: 15, description: 'Peak solar hours' })
+  ]) as HourlyProductionAnalysis['optimal_windows'],
+  total_production_hours: 8,
+  max_irradiance: 500
+});
+
+// Index range [start, end) of one day within the hourly series
+interface HourRange {
+  start: number;
+  end: number;
+}
+
+const EMPTY_HOUR_RANGE: HourRange = { start: 0, end: 0 };
+
+// Open-Meteo response plus the per-day values derived from it
+interface PreparedForecast {
+  daily: any;
+  hourly: any;
+  dayCount: number;
+  hourlyDays: Map<string, HourRange>;
+  solarRadiation: number[];
+  expectedProduction: number[];
+  confidence: number[];
+}
+
+// Optimal usage window tiers, strictest first
+const OPTIMAL_WINDOW_TIERS = [
+  { minIrradiance: 400, maxCloudCover: 30, maxPrecipitation: 20, description: 'Millor moment per electrodomèstics' },
+  { minIrradiance: 200, maxCloudCover: 60, maxPrecipitation: 40, description: 'Bon moment per ús' },
+  { minIrradiance: 100, maxCloudCover: 80, maxPrecipitation: 60, description: 'Moment acceptable' },
+  { minIrradiance: 50, maxCloudCover: Infinity, maxPrecipitation: Infinity, description: 'Millor moment disponible' },
+];
+
 export async function GET(request: NextRequest) {
   try {
     const { searchParams } = new URL(request.url);
     const days = parseInt(searchParams.get('days') || '7');
     const solarCapacity = parseInt(searchParams.get('capacity') || '2200');
+    const refresh = searchParams.get('refresh') === 'true';
+    // ?format=columns returns one array per field instead of one object per day
+    const columnar = searchParams.get('format') === 'columns';
     
-    const response = await axios.get(API_BASE_URL, {
-      params: {
-        latitude: LOCATION.latitude,
-        longitude: LOCATION.longitude,
-        daily: [
-          'temperature_2m_max',
-          'temperature_2m_min',
-          'uv_index_max',
-          'cloud_cover_mean',
-          'precipitation_probability_max',
-          'wind_speed_10m_max',
-          'weather_code'
-        ].join(','),
-        hourly: [
-          'temperature_2m',
-          'cloud_cover',
-          'uv_index',
-          'global_tilted_irradiance',
-          'precipitation_probability',
-          'wind_speed_10m',
-          'weather_code'
-        ].join(','),
-        timezone: 'Europe/Madrid',
-        forecast_days: days
-      },
-      timeout: 10000
-    });
+    const forecast = await fetchForecastData(days, refresh);
+    const { daily, hourly, hourlyDays } = forecast;
 
-    const daily = response.data.daily;
-    const hourly = response.data.hourly;
-    const weatherForecast = [];
-    const solarForecast = [];
+    // Nothing to analyze: answer with an empty forecast instead of failing in the loop
+    if (forecast.dayCount === 0) {
+      return NextResponse.json({
+        weather: [],
+        solar: [],
+        timestamp: new Date().toISOString()
+      }, {
+        status: 200,
+        headers: RESPONSE_HEADERS,
+      });
+    }
+
+    const dayCount = Math.min(forecast.dayCount, days);
+    const weatherForecast = new Array<WeatherForecast>(dayCount);
+    const solarForecast = new Array<SolarForecast>(dayCount);
 
-    for (let i = 0; i < daily.time.length && i < days; i++) {
+    for (let i = 0; i < dayCount; i++) {
+      // Read each daily column once per day; derived values were computed when the forecast was fetched
       const currentDate = daily.time[i];
-      
-      // Calculate estimated solar radiation based on UV index and cloud cover
-      const estimatedSolarRadiation = daily.uv_index_max[i] * 100 * (1 - daily.cloud_cover_mean[i] / 100);
-      const expectedSolarProduction = calculateExpectedSolarProduction(
-        estimatedSolarRadiation,
-        daily.cloud_cover_mean[i],
-        daily.uv_index_max[i]
-      );
-
-      const confidence = calculateForecastConfidence({
-        cloud_cover: daily.cloud_cover_mean[i],
-        precipitation_probability: daily.precipitation_probability_max[i]
-      });
+      const weatherCode = daily.weather_code[i];
+      const estimatedSolarRadiation = forecast.solarRadiation[i]!;
+      const expectedSolarProduction = forecast.expectedProduction[i]!;
+      const confidence = forecast.confidence[i]!;
 
-      // Calculate real peak hour from hourly solar radiation data
-      const peakHour = calculatePeakHour(hourly, currentDate);
+      // Hourly analysis also yields the real peak hour from hourly solar radiation data
+      const dayRange = hourlyDays.get(currentDate) || EMPTY_HOUR_RANGE;
+      const hourlyAnalysis = analyzeHourlyProduction(hourly, dayRange, solarCapacity);
 
-      weatherForecast.push({
+      weatherForecast[i] = {
         date: currentDate,
         location: LOCATION.name,
         temperature_min: daily.temperature_2m_min[i],
         temperature_max: daily.temperature_2m_max[i],
         cloud_cover: daily.cloud_cover_mean[i],
         uv_index: daily.uv_index_max[i],
-        solar_radiation: estimatedSolarRadiation,
+        solar_radiation: roundTo(estimatedSolarRadiation, 1),
         precipitation_probability: daily.precipitation_probability_max[i],
         wind_speed: daily.wind_speed_10m_max[i],
-        weather_code: daily.weather_code[i],
-        weather_description: getWeatherDescription(daily.weather_code[i]),
-        expected_solar_production: expectedSolarProduction,
+        weather_code: weatherCode,
+        weather_description: getWeatherDescription(weatherCode),
+        expected_solar_production: roundTo(expectedSolarProduction, 3),
         forecast_created_at: new Date().toISOString(),
-      });
+      };
 
-      solarForecast.push({
+      solarForecast[i] = {
         date: currentDate,
-        estimated_production_kwh: expectedSolarProduction * solarCapacity / 1000,
-        peak_production_hour: peakHour,
-        weather_factor: expectedSolarProduction,
-        confidence_level: confidence,
+        estimated_production_kwh: roundTo(expectedSolarProduction * solarCapacity / 1000, 2),
+        peak_production_hour: hourlyAnalysis.peak_hour,
+        weather_factor: roundTo(expectedSolarProduction, 3),
+        confidence_level: roundTo(confidence, 2),
         // Add enhanced hourly analysis
-        hourly_analysis: analyzeHourlyProduction(hourly, currentDate, solarCapacity),
-      });
+        hourly_analysis: hourlyAnalysis,
+      };
     }
     
     return NextResponse.json({
-      weather: weatherForecast,
-      solar: solarForecast,
+      weather: columnar ? toColumns(weatherForecast) : weatherForecast,
+      solar: columnar ? toColumns(solarForecast) : solarForecast,
       timestamp: new Date().toISOString()
     }, {
       status: 200,
-      headers: {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET',
-        'Access-Control-Allow-Headers': 'Content-Type',
-      },
+      headers: RESPONSE_HEADERS,
     });
   } catch (error) {
-    console.error('Forecast API error:', error);
+    logger.error('Forecast API error:', error);
     return NextResponse.json(
       { 
         error: 'Failed to fetch forecast data',
@@ -119,6 +188,115 @@ export async function GET(request: NextRequest) {
   }
 }
 
+/**
+ * Fetch the Open-Meteo forecast, reusing a recent response for the same number of days.
+ * The forecast changes at most hourly, so dashboard refreshes are served from memory.
+ */
+async function fetchForecastData(days: number, refresh: boolean = false): Promise<PreparedForecast> {
+  const cached = forecastCache.get(days);
+  if (!refresh && cached && Date.now() < cached.expiresAt) {
+    return cached.forecast;
+  }
+
+  const response = await axios.get(API_BASE_URL, {
+    params: {
+      latitude: LOCATION.latitude,
+      longitude: LOCATION.longitude,
+      daily: [
+        'temperature_2m_max',
+        'temperature_2m_min',
+        'uv_index_max',
+        'cloud_cover_mean',
+        'precipitation_probability_max',
+        'wind_speed_10m_max',
+        'weather_code'
+      ].join(','),
+      hourly: [
+        'temperature_2m',
+        'cloud_cover',
+        'uv_index',
+        'global_tilted_irradiance',
+        'precipitation_probability',
+        'weather_code'
+      ].join(','),
+      timezone: 'Europe/Madrid',
+      forecast_days: days
+    },
+    timeout: 10000
+  });
+
+  const forecast = prepareForecast(response.data);
+  forecastCache.set(days, { expiresAt: Date.now() + FORECAST_CACHE_TTL_MS, forecast });
+  return forecast;
+}
+
+/**
+ * Derive the per-day values that do not depend on the request (estimated radiation,
+ * production factor, confidence and each day's hourly range) once per fetched response.
+ */
+function prepareForecast(data: any): PreparedForecast {
+  const daily = data?.daily;
+  const hourly = data?.hourly;
+  // Daily data alone is enough; days without hourly data use the fallback analysis
+  const dayCount = daily?.time?.length || 0;
+
+  const solarRadiation = new Array<number>(dayCount);
+  const expectedProduction = new Array<number>(dayCount);
+  const confidence = new Array<number>(dayCount);
+
+  for (let i = 0; i < dayCount; i++) {
+    const cloudCover = daily.cloud_cover_mean[i];
+    const uvIndex = daily.uv_index_max[i];
+
+    // Calculate estimated solar radiation based on UV index and cloud cover
+    solarRadiation[i] = uvIndex * 100 * (1 - cloudCover / 100);
+    expectedProduction[i] = calculateExpectedSolarProduction(solarRadiation[i]!, cloudCover, uvIndex);
+    confidence[i] = calculateForecastConfidence({
+      cloud_cover: cloudCover,
+      precipitation_probability: daily.precipitation_probability_max[i]
+    });
+  }
+
+  return {
+    daily,
+    hourly,
+    dayCount,
+    // Locate each day's slice of the hourly series once instead of rescanning it for every day
+    hourlyDays: hourly?.time ? indexHourlyDays(hourly) : new Map(),
+    solarRadiation,
+    expectedProduction,
+    confidence,
+  };
+}
+
+/**
+ * Pivot same-shaped records into one array per field, for chart and table consumers
+ */
+function toColumns<T extends object>(records: T[]): { [K in keyof T]: Array<T[K]> } {
+  const columns = {} as { [K in keyof T]: Array<T[K]> };
+  if (records.length === 0) {
+    return columns;
+  }
+
+  const keys = Object.keys(records[0]!) as Array<keyof T>;
+  for (const key of keys) {
+    const column = new Array<T[typeof key]>(records.length);
+    for (let i = 0; i < records.length; i++) {
+      column[i] = records[i]![key];
+    }
+    columns[key] = column;
+  }
+  return columns;
+}
+
+/**
+ * Round a derived value for the response payload; full double precision is noise here
+ */
+function roundTo(value: number, decimals: number): number {
+  const factor = 10 ** decimals;
+  return Math.round(value * factor) / factor;
+}
+
 function calculateExpectedSolarProduction(
   solarRadiation: number,
   cloudCover: number,
@@ -160,233 +338,125 @@ function calculateForecastConfidence(forecast: { cloud_cover: number; precipitat
 }
 
 function getWeatherDescription(weatherCode: number): string {
-  const weatherCodes: Record<number, string> = {
-    0: 'Clear sky',
-    1: 'Mainly clear',
-    2: 'Partly cloudy',
-    3: 'Overcast',
-    45: 'Fog',
-    48: 'Depositing rime fog',
-    51: 'Light drizzle',
-    53: 'Moderate drizzle',
-    55: 'Dense drizzle',
-    56: 'Light freezing drizzle',
-    57: 'Dense freezing drizzle',
-    61: 'Slight rain',
-    63: 'Moderate rain',
-    65: 'Heavy rain',
-    66: 'Light freezing rain',
-    67: 'Heavy freezing rain',
-    71: 'Slight snow fall',
-    73: 'Moderate snow fall',
-    75: 'Heavy snow fall',
-    77: 'Snow grains',
-    80: 'Slight rain showers',
-    81: 'Moderate rain showers',
-    82: 'Violent rain showers',
-    85: 'Slight snow showers',
-    86: 'Heavy snow showers',
-    95: 'Thunderstorm',
-    96: 'Thunderstorm with slight hail',
-    99: 'Thunderstorm with heavy hail',
-  };
-  
-  return weatherCodes[weatherCode] || 'Unknown';
+  return WEATHER_CODES[weatherCode] || 'Unknown';
 } 
 
 /**
- * Calculate the peak production hour based on hourly solar radiation data
+ * Index the hourly forecast series by day in a single pass.
+ * Open-Meteo returns the series in time order, so each day is one contiguous index range.
+ * Times are local "YYYY-MM-DDTHH:MM" strings, so date and hour are plain slices.
  */
-function calculatePeakHour(hourlyData: any, targetDate: string): number {
-  try {
-    // Find the day's data
-    const dayStart = new Date(targetDate);
-    const dayEnd = new Date(targetDate);
-    dayEnd.setDate(dayEnd.getDate() + 1);
-    
-    const dayStartStr = dayStart.toISOString().split('T')[0] || targetDate;
-    const dayEndStr = dayEnd.toISOString().split('T')[0] || targetDate;
-    
-    // Get hourly data for this specific day
-    const dayHourlyData = hourlyData.time
-      .map((time: string, index: number) => ({
-        time,
-        irradiance: hourlyData.global_tilted_irradiance[index],
-        hour: new Date(time).getHours()
-      }))
-      .filter((item: any) => {
-        const itemDate = item.time.split('T')[0];
-        return itemDate >= dayStartStr && itemDate < dayEndStr;
-      });
-    
-    // Find hour with maximum solar radiation
-    if (dayHourlyData.length === 0) {
-      return 13; // Fallback to typical peak
+function indexHourlyDays(hourlyData: any): Map<string, HourRange> {
+  const dayRanges = new Map<string, HourRange>();
+
+  for (let index = 0; index < hourlyData.time.length; index++) {
+    const date: string = hourlyData.time[index].slice(0, 10);
+    const range = dayRanges.get(date);
+    if (range) {
+      range.end = index + 1;
+    } else {
+      dayRanges.set(date, { start: index, end: index + 1 });
     }
-    
-    const peakHour = dayHourlyData.reduce((max: any, current: any) => 
-      current.irradiance > max.irradiance ? current : max
-    );
-    
-    return peakHour.hour;
-  } catch (error) {
-    console.error('Error calculating peak hour:', error);
-    return 13; // Fallback to typical peak
   }
-} 
+
+  return dayRanges;
+}
+
+/**
+ * Classify one forecast hour into its strictest optimal-window tier.
+ * Returns the tier code (index into OPTIMAL_WINDOW_TIERS), or -1 when no tier applies.
+ */
+function classifyHourTier(irradiance: number, cloudCover: number, precipitation: number): number {
+  for (let tier = 0; tier < OPTIMAL_WINDOW_TIERS.length; tier++) {
+    const limits = OPTIMAL_WINDOW_TIERS[tier]!;
+    if (
+      irradiance > limits.minIrradiance &&
+      cloudCover < limits.maxCloudCover &&
+      precipitation < limits.maxPrecipitation
+    ) {
+      return tier;
+    }
+  }
+  return -1;
+}
 
 /**
  * Analyze hourly production to provide optimization insights based on real weather data
  */
-function analyzeHourlyProduction(hourlyData: any, targetDate: string, solarCapacity: number): any {
+function analyzeHourlyProduction(hourlyData: any, range: HourRange, solarCapacity: number): HourlyProductionAnalysis {
   try {
-    // Find the day's data
-    const dayStart = new Date(targetDate);
-    const dayEnd = new Date(targetDate);
-    dayEnd.setDate(dayEnd.getDate() + 1);
-    
-    const dayStartStr = dayStart.toISOString().split('T')[0] || targetDate;
-    const dayEndStr = dayEnd.toISOString().split('T')[0] || targetDate;
+    if (range.end <= range.start) {
+      return FALLBACK_HOURLY_ANALYSIS;
+    }
     
-    // Get hourly data for this specific day
-    const dayHourlyData = hourlyData.time
-      .map((time: string, index: number) => ({
+    // Find optimal usage windows based on weather conditions.
+    // Tiers are nested (excellent ⊂ good ⊂ moderate ⊂ best available), so each hour is
+    // classified once into its strictest tier and the first non-empty tier gives the window.
+    const tierStart = [24, 24, 24, 24];
+    const tierEnd = [-1, -1, -1, -1];
+
+    // Production window, peak and max irradiance are folded into the same pass,
+    // which reads the hourly columns directly and builds the per-hour entries as it goes.
+    // Only hours with meaningful solar production (>100 W/m²) count as production hours.
+    let productionStart = 24;
+    let productionEnd = -1;
+    let totalProductionHours = 0;
+    let peakHour: HourlyForecastPoint | null = null;
+    let maxIrradiance = -Infinity;
+    const dayHourlyData = new Array<HourlyForecastPoint>(range.end - range.start);
+
+    for (let index = range.start; index < range.end; index++) {
+      const time: string = hourlyData.time[index];
+      const item: HourlyForecastPoint = {
         time,
-        hour: new Date(time).getHours(),
+        hour: Number(time.slice(11, 13)),
         irradiance: hourlyData.global_tilted_irradiance[index],
         cloudCover: hourlyData.cloud_cover[index],
         temperature: hourlyData.temperature_2m[index],
         uvIndex: hourlyData.uv_index[index],
         precipitation: hourlyData.precipitation_probability[index],
         weatherCode: hourlyData.weather_code[index]
-      }))
-      .filter((item: any) => {
-        const itemDate = item.time.split('T')[0];
-        return itemDate >= dayStartStr && itemDate < dayEndStr;
-      });
-    
-    if (dayHourlyData.length === 0) {
-      return {
-        production_start: 8,
-        production_end: 18,
-        peak_hour: 13,
-        optimal_windows: [
-          { start: 11, end: 15, description: 'Peak solar hours' }
-        ],
-        total_production_hours: 8,
-        max_irradiance: 500
       };
+      dayHourlyData[index - range.start] = item;
+
+      if (item.irradiance > 100) {
+        productionStart = Math.min(productionStart, item.hour);
+        productionEnd = Math.max(productionEnd, item.hour);
+        totalProductionHours++;
+      }
+      if (peakHour === null || item.irradiance > peakHour.irradiance) {
+        peakHour = item;
+      }
+      maxIrradiance = Math.max(maxIrradiance, item.irradiance);
+
+      const tier = classifyHourTier(item.irradiance, item.cloudCover, item.precipitation);
+      if (tier >= 0) {
+        tierStart[tier] = Math.min(tierStart[tier]!, item.hour);
+        tierEnd[tier] = Math.max(tierEnd[tier]!, item.hour);
+      }
     }
-    
-    // Calculate production windows based on REAL solar radiation
-    // Only include hours with meaningful solar production (>100 W/m²)
-    const productionHours = dayHourlyData.filter((item: any) => item.irradiance > 100);
-    const productionStart = productionHours.length > 0 ? Math.min(...productionHours.map((h: any) => h.hour)) : 8;
-    const productionEnd = productionHours.length > 0 ? Math.max(...productionHours.map((h: any) => h.hour)) : 18;
-    
-    // Find optimal usage windows based on weather conditions
-    const optimalWindows = [];
-    
-    // High production window: hours with excellent conditions
-    const excellentHours = dayHourlyData.filter((item: any) => 
-      item.irradiance > 400 && 
-      item.cloudCover < 30 && 
-      item.precipitation < 20
-    );
-    
-    if (excellentHours.length > 0) {
-      const excellentStart = Math.min(...excellentHours.map((h: any) => h.hour));
-      const excellentEnd = Math.max(...excellentHours.map((h: any) => h.hour));
-      
-      optimalWindows.push({
-        start: excellentStart,
-        end: excellentEnd,
-        description: 'Millor moment per electrodomèstics'
-      });
-    }
-    
-    // Good production window: hours with good conditions
-    const goodHours = dayHourlyData.filter((item: any) => 
-      item.irradiance > 200 && 
-      item.cloudCover < 60 && 
-      item.precipitation < 40
-    );
-    
-    if (goodHours.length > 0 && optimalWindows.length === 0) {
-      const goodStart = Math.min(...goodHours.map((h: any) => h.hour));
-      const goodEnd = Math.max(...goodHours.map((h: any) => h.hour));
-      
-      optimalWindows.push({
-        start: goodStart,
-        end: goodEnd,
-        description: 'Bon moment per ús'
-      });
-    }
-    
-    // Moderate production window: hours with acceptable conditions
-    const moderateHours = dayHourlyData.filter((item: any) => 
-      item.irradiance > 100 && 
-      item.cloudCover < 80 && 
-      item.precipitation < 60
-    );
-    
-    if (moderateHours.length > 0 && optimalWindows.length === 0) {
-      const moderateStart = Math.min(...moderateHours.map((h: any) => h.hour));
-      const moderateEnd = Math.max(...moderateHours.map((h: any) => h.hour));
-      
+
+    const optimalWindows: HourlyProductionAnalysis['optimal_windows'] = [];
+    const windowTier = tierEnd.findIndex(end => end >= 0);
+    if (windowTier >= 0) {
       optimalWindows.push({
-        start: moderateStart,
-        end: moderateEnd,
-        description: 'Moment acceptable'
+        start: tierStart[windowTier]!,
+        end: tierEnd[windowTier]!,
+        description: OPTIMAL_WINDOW_TIERS[windowTier]!.description
       });
     }
     
-    // If no optimal windows found, create a fallback based on best available hours
-    if (optimalWindows.length === 0) {
-      const bestHours = dayHourlyData.filter((item: any) => item.irradiance > 50);
-      if (bestHours.length > 0) {
-        const bestStart = Math.min(...bestHours.map((h: any) => h.hour));
-        const bestEnd = Math.max(...bestHours.map((h: any) => h.hour));
-        
-        optimalWindows.push({
-          start: bestStart,
-          end: bestEnd,
-          description: 'Millor moment disponible'
-        });
-      }
-    }
-    
-    // Find peak hour (hour with maximum solar radiation)
-    const peakHour = dayHourlyData.reduce((max: any, current: any) => 
-      current.irradiance > max.irradiance ? current : max
-    );
-    
-    // Calculate total production hours (hours with meaningful production)
-    const totalProductionHours = productionHours.length;
-    
-    // Calculate max irradiance
-    const maxIrradiance = Math.max(...dayHourlyData.map((h: any) => h.irradiance));
-    
     return {
-      production_start: productionStart,
-      production_end: productionEnd,
-      peak_hour: peakHour.hour,
+      production_start: totalProductionHours > 0 ? productionStart : 8,
+      production_end: totalProductionHours > 0 ? productionEnd : 18,
+      peak_hour: peakHour!.hour,
       optimal_windows: optimalWindows,
       total_production_hours: totalProductionHours,
       max_irradiance: maxIrradiance,
       hourly_data: dayHourlyData // Include detailed hourly data for frontend
     };
   } catch (error) {
-    console.error('Error analyzing hourly production:', error);
-    return {
-      production_start: 8,
-      production_end: 18,
-      peak_hour: 13,
-      optimal_windows: [
-        { start: 11, end: 15, description: 'Peak solar hours' }
-      ],
-      total_production_hours: 8,
-      max_irradiance: 500
-    };
+    logger.error('Error analyzing hourly production:', error);
+    return FALLBACK_HOURLY_ANALYSIS;
   }
 } 
\ No newline at end of file
@@ -7,7 +7,7 @@
  * Based on the Python analytics optimizer implementation.
  */
 
-import { DatabaseManager } from '@repo/database';
+import { DatabaseManager, getDatabase } from '@repo/database';
 import WeatherService from './weather';
 import type {
   OptimizationTip,
@@ -22,17 +22,143 @@ import type {
   PowerData,
   EnergyRecord,
   DailyEnergyRecord,
+  HourlyEnergyTotals,
   TipPriority,
   TipCategory,
 } from '@repo/types';
 
+interface EnergyWindowSummary {
+  samples: number;
+  production: number;
+  consumption: number;
+  gridImport: number;
+  gridExport: number;
+  /** Per-hour-of-day sums, indexed 0-23 */
+  hourlyProduction: Float64Array;
+  hourlyConsumption: Float64Array;
+  hourlySamples: Float64Array;
+}
+
+/** Format a date as YYYY-MM-DD in local time (daily_energy keys) */
+function toLocalDateString(date: Date): string {
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${date.getFullYear()}-${month}-${day}`;
+}
+
+// Fixed hour windows for the evening vs midday comparison
+const EVENING_HOURS: readonly number[] = [18, 19, 20, 21, 22];
+const MIDDAY_HOURS: readonly number[] = [11, 12, 13, 14, 15];
+
+/** Mean over the given hours, skipping hours with no data (NaN) */
+function meanOverHours(hourly: Float64Array, hours: readonly number[]): number {
+  let sum = 0;
+  let count = 0;
+  for (let i = 0; i < hours.length; i++) {
+    const value = hourly[hours[i]!]!;
+    if (Number.isNaN(value)) continue;
+    sum += value;
+    count++;
+  }
+  return count > 0 ? sum / count : 0;
+}
+
+/**
+ * Fold per-hour SQL aggregates into window totals in a single pass.
+ * Kept as a small standalone loop over plain numbers so it stays monomorphic.
+ */
+function foldHourlyTotals(hourlyTotals: HourlyEnergyTotals[]): EnergyWindowSummary {
+  let samples = 0;
+  let production = 0;
+  let consumption = 0;
+  let gridImport = 0;
+  let gridExport = 0;
+  const hourlyProduction = new Float64Array(24);
+  const hourlyConsumption = new Float64Array(24);
+  const hourlySamples = new Float64Array(24);
+
+  for (let i = 0; i < hourlyTotals.length; i++) {
+    const bucket = hourlyTotals[i]!;
+    samples += bucket.samples;
+    production += bucket.production;
+    consumption += bucket.consumption;
+    gridImport += bucket.grid_import;
+    gridExport += bucket.grid_export;
+    hourlyProduction[bucket.hour]! += bucket.production;
+    hourlyConsumption[bucket.hour]! += bucket.consumption;
+    hourlySamples[bucket.hour]! += bucket.samples;
+  }
+
+  return { samples, production, consumption, gridImport, gridExport, hourlyProduction, hourlyConsumption, hourlySamples };
+}
+
+// Fixed elderly advice entries; shared and frozen, so callers must not mutate them
+const MORNING_ADVICE: Readonly<ElderlyAdvice> = Object.freeze({
+  id: 'morning-advice',
+  title_catalan: 'Bon dia! ☀️',
+  description_catalan: 'Els panells solars ja estan produint energia. És un bon moment per preparar l\'esmorzar.',
+  simple_action: 'Posa la cafetera i tosta el pa',
+  timing_recommendation: 'Ara mateix',
+  potential_benefit: 'Energia gratis per començar el dia',
+  priority: 'medium',
+});
+
+const LUNCH_ADVICE: Readonly<ElderlyAdvice> = Object.freeze({
+  id: 'lunch-advice',
+  title_catalan: 'Hora de dinar! 🍽️',
+  description_catalan: 'És el millor moment del dia per cuinar amb energia solar.',
+  simple_action: 'Usa el forn o la vitroceràmica',
+  timing_recommendation: 'Les properes 2 hores',
+  potential_benefit: 'Cuina completament gratis',
+  priority: 'high',
+});
+
+/** Place tips into priority buckets (high, medium, low), keeping generation order within each */
+function orderTipsByPriority(tips: OptimizationTip[]): OptimizationTip[] {
+  const buckets: Record<TipPriority, OptimizationTip[]> = { high: [], medium: [], low: [] };
+  for (const tip of tips) {
+    buckets[tip.priority].push(tip);
+  }
+  return [...buckets.high, ...buckets.medium, ...buckets.low];
+}
+
+/** Build a frozen daily insight; every insight shares one shape and field order */
+function createInsight(
+  createdAt: Date,
+  type: EnergyInsight['type'],
+  title: string,
+  description: string,
+  value: number,
+  unit: string,
+  trend: EnergyInsight['trend'],
+  confidence: number
+): EnergyInsight {
+  return Object.freeze({
+    id: `insight-${type}-${createdAt.getTime()}`,
+    type,
+    title,
+    description,
+    value,
+    unit,
+    trend,
+    period: 'daily',
+    confidence,
+    created_at: createdAt.toISOString(),
+  });
+}
+
 export class EnergyAnalytics {
   private db: DatabaseManager;
   private weatherService: WeatherService;
   private solarCapacity: number;
+  private summaryCache: Map<number, { latest: string | null; expiresAt: number; summary: EnergyWindowSummary }> = new Map();
+  private summaryCacheDuration: number = 5 * 60 * 1000; // 5 minutes
+  private rollupHistoryDays: number = 30;
+  private lastRollupDate: string | null = null;
+  private energyPatterns: EnergyPattern[] | null = null;
 
   constructor(dbPath?: string, solarCapacity: number = 2200) {
-    this.db = new DatabaseManager(dbPath);
+    this.db = getDatabase(dbPath);
     this.weatherService = new WeatherService(dbPath);
     this.solarCapacity = solarCapacity;
   }
@@ -41,6 +167,14 @@ export class EnergyAnalytics {
    * Generate optimization tips based on historical data and current conditions
    */
   async generateOptimizationTips(currentData: PowerData, elderlyFriendly: boolean = false): Promise<OptimizationTip[]> {
+    // Nothing to optimize without a reading; skip the weather lookup as well
+    if (currentData.P_PV === 0 && currentData.P_Load === 0) {
+      return [];
+    }
+
+    // Start the weather lookup first so the network wait overlaps the local tip rules
+    const weatherTipsPromise = this.generateWeatherBasedTips(elderlyFriendly);
+
     const tips: OptimizationTip[] = [];
     const surplus = currentData.P_PV - currentData.P_Load;
     const hour = new Date().getHours();
@@ -104,13 +238,13 @@ export class EnergyAnalytics {
 
     // Weather-based tips
     try {
-      const weatherTips = await this.generateWeatherBasedTips(elderlyFriendly);
+      const weatherTips = await weatherTipsPromise;
       tips.push(...weatherTips);
     } catch (error) {
       console.log('Could not generate weather-based tips:', error);
     }
 
-    return tips;
+    return orderTipsByPriority(tips);
   }
 
   /**
@@ -170,11 +304,9 @@ export class EnergyAnalytics {
    */
   async calculateEfficiencyMetrics(currentData: PowerData): Promise<EfficiencyMetrics> {
     // Get recent data for calculations
-    const endDate = new Date().toISOString();
-    const startDate = new Date(Date.now() - 24 * 60 * 60 * 1000).toISOString(); // Last 24 hours
-    const recentRecords = await this.db.getEnergyRecords(startDate, endDate);
+    const summary = await this.summarizeLastDays(1); // Last 24 hours
 
-    if (recentRecords.length === 0) {
+    if (summary.samples === 0) {
       // Return default metrics if no historical data
       return {
         self_consumption_rate: 0,
@@ -189,10 +321,10 @@ export class EnergyAnalytics {
     }
 
     // Calculate metrics from recent data
-    const totalProduction = recentRecords.reduce((sum, record) => sum + record.production, 0);
-    const totalConsumption = recentRecords.reduce((sum, record) => sum + record.consumption, 0);
-    const totalGridImport = recentRecords.reduce((sum, record) => sum + record.grid_import, 0);
-    const totalGridExport = recentRecords.reduce((sum, record) => sum + record.grid_export, 0);
+    const totalProduction = summary.production;
+    const totalConsumption = summary.consumption;
+    const totalGridImport = summary.gridImport;
+    const totalGridExport = summary.gridExport;
 
     // Self-consumption rate: how much of produced energy is used directly
     const selfConsumptionRate = totalProduction > 0 ? 
@@ -216,6 +348,12 @@ export class EnergyAnalytics {
     const gridEnergyAvoided = totalConsumption - totalGridImport;
     const dailySavings = (gridEnergyAvoided / 1000) * 0.12; // 0.12€ per kWh
 
+    // Monthly trend: last 24h savings against the average of the rolled-up days
+    const dailyHistory = await this.getDailyHistory(this.rollupHistoryDays);
+    const averageSavings = dailyHistory.length > 0 ?
+      dailyHistory.reduce((sum, day) => sum + day.savings_euros, 0) / dailyHistory.length : 0;
+    const monthlyTrend = averageSavings > 0 ? ((dailySavings - averageSavings) / averageSavings) * 100 : 0;
+
     return {
       self_consumption_rate: Math.round(selfConsumptionRate * 10) / 10,
       autonomy_rate: Math.round(autonomyRate * 10) / 10,
@@ -223,20 +361,70 @@ export class EnergyAnalytics {
       solar_utilization: Math.round(solarUtilization * 10) / 10,
       grid_dependency: Math.round(gridDependency * 10) / 10,
       daily_savings: Math.round(dailySavings * 100) / 100,
-      monthly_trend: 0, // Would need more historical data
+      monthly_trend: Math.round(monthlyTrend * 10) / 10,
       yearly_projection: dailySavings * 365,
     };
   }
 
+  /**
+   * Get per-day rollups for the last N complete days.
+   * Missing past days are rolled up from raw energy data once per day.
+   */
+  private async getDailyHistory(days: number): Promise<DailyEnergyRecord[]> {
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    const firstDay = new Date(today);
+    firstDay.setDate(firstDay.getDate() - days);
+    const startDate = toLocalDateString(firstDay);
+    const endDate = toLocalDateString(new Date(today.getTime() - 1));
+
+    if (this.lastRollupDate !== toLocalDateString(today)) {
+      const existing = await this.db.getDailyEnergyRecords(startDate, endDate);
+      const rolledUp = new Set(existing.map(record => record.date));
+      const missingDays: Array<{ date: string; startTimestamp: string; endTimestamp: string }> = [];
+
+      for (const day = new Date(firstDay); day < today; day.setDate(day.getDate() + 1)) {
+        const date = toLocalDateString(day);
+        if (rolledUp.has(date)) continue;
+
+        const nextDay = new Date(day);
+        nextDay.setDate(nextDay.getDate() + 1);
+        missingDays.push({ date, startTimestamp: day.toISOString(), endTimestamp: nextDay.toISOString() });
+      }
+      await this.db.rollupDailyEnergy(missingDays);
+      this.lastRollupDate = toLocalDateString(today);
+    }
+
+    return await this.db.getDailyEnergyRecords(startDate, endDate);
+  }
+
+  /**
+   * Summarize the last N days from per-hour SQL aggregates.
+   * Results are reused until new energy data arrives or the cache expires.
+   */
+  private async summarizeLastDays(days: number): Promise<EnergyWindowSummary> {
+    const latest = await this.db.getLatestEnergyTimestamp();
+    const cached = this.summaryCache.get(days);
+    if (cached && cached.latest === latest && Date.now() < cached.expiresAt) {
+      return cached.summary;
+    }
+
+    const endDate = new Date().toISOString();
+    const startDate = new Date(Date.now() - days * 24 * 60 * 60 * 1000).toISOString();
+    const hourlyTotals = await this.db.getHourlyEnergyTotals(startDate, endDate);
+    const summary = foldHourlyTotals(hourlyTotals);
+
+    this.summaryCache.set(days, { latest, expiresAt: Date.now() + this.summaryCacheDuration, summary });
+    return summary;
+  }
+
   /**
    * Analyze energy consumption patterns
    */
   async analyzeConsumptionPatterns(): Promise<ConsumptionAnalysis> {
-    const endDate = new Date().toISOString();
-    const startDate = new Date(Date.now() - 7 * 24 * 60 * 60 * 1000).toISOString(); // Last 7 days
-    const records = await this.db.getEnergyRecords(startDate, endDate);
+    const summary = await this.summarizeLastDays(7); // Last 7 days
 
-    if (records.length === 0) {
+    if (summary.samples === 0) {
       return {
         period: 'last_7_days',
         total_consumption: 0,
@@ -247,37 +435,40 @@ export class EnergyAnalytics {
       };
     }
 
-    const totalConsumption = records.reduce((sum, record) => sum + record.consumption, 0);
+    const totalConsumption = summary.consumption;
 
-    // Analyze hourly patterns
-    const hourlyConsumption: { [hour: number]: number } = {};
-    for (let i = 0; i < 24; i++) {
-      hourlyConsumption[i] = 0;
+    // Mean watts per hour of day, from the running sum and sample count.
+    // Hours without samples stay NaN so they are not mistaken for zero consumption.
+    const hourlyConsumption = new Float64Array(24).fill(NaN);
+    const hoursWithData: number[] = [];
+    for (let hour = 0; hour < 24; hour++) {
+      const samples = summary.hourlySamples[hour]!;
+      if (samples > 0) {
+        hourlyConsumption[hour] = summary.hourlyConsumption[hour]! / samples;
+        hoursWithData.push(hour);
+      }
     }
 
-    records.forEach(record => {
-      const hour = new Date(record.timestamp).getHours();
-      hourlyConsumption[hour] += record.consumption;
-    });
-
     // Find peak and off-peak hours
-    const hourlyAverages = Object.entries(hourlyConsumption)
-      .map(([hour, consumption]) => ({ hour: parseInt(hour), consumption }))
-      .sort((a, b) => b.consumption - a.consumption);
+    const hoursByConsumption = hoursWithData
+      .sort((a, b) => hourlyConsumption[b]! - hourlyConsumption[a]!);
 
-    const peakHours = hourlyAverages.slice(0, 3).map(h => h.hour);
-    const offPeakHours = hourlyAverages.slice(-4).map(h => h.hour);
+    const peakHours = hoursByConsumption.slice(0, 3);
+    const offPeakHours = hoursByConsumption.slice(-4);
 
     // Identify waste opportunities
     const wasteOpportunities: string[] = [];
     
     // High consumption during low solar hours
-    if (hourlyConsumption[20] > hourlyConsumption[13]) {
+    if (meanOverHours(hourlyConsumption, EVENING_HOURS) > meanOverHours(hourlyConsumption, MIDDAY_HOURS)) {
       wasteOpportunities.push('High evening consumption - consider shifting activities to midday');
     }
     
     // Base load analysis
-    const minConsumption = Math.min(...Object.values(hourlyConsumption));
+    let minConsumption = Infinity;
+    for (let i = 0; i < hoursWithData.length; i++) {
+      minConsumption = Math.min(minConsumption, hourlyConsumption[hoursWithData[i]!]!);
+    }
     if (minConsumption > 500) {
       wasteOpportunities.push('High base load - check for standby power consumption');
     }
@@ -312,31 +503,14 @@ export class EnergyAnalytics {
     const patterns = this.generateEnergyPatterns();
 
     // Generate basic insights
+    const createdAt = new Date();
     const insights: EnergyInsight[] = [
-      {
-        id: `insight-efficiency-${Date.now()}`,
-        type: 'efficiency',
-        title: 'System Efficiency',
-        description: `Your solar system is operating at ${metrics.efficiency_score}% efficiency`,
-        value: metrics.efficiency_score,
-        unit: '%',
-        trend: metrics.efficiency_score > 70 ? 'improving' : 'stable',
-        period: 'daily',
-        confidence: 0.9,
-        created_at: new Date().toISOString(),
-      },
-      {
-        id: `insight-savings-${Date.now()}`,
-        type: 'savings',
-        title: 'Daily Savings',
-        description: `You saved ${metrics.daily_savings}€ today using solar energy`,
-        value: metrics.daily_savings,
-        unit: '€',
-        trend: 'improving',
-        period: 'daily',
-        confidence: 0.85,
-        created_at: new Date().toISOString(),
-      }
+      createInsight(createdAt, 'efficiency', 'System Efficiency',
+        `Your solar system is operating at ${metrics.efficiency_score}% efficiency`,
+        metrics.efficiency_score, '%', metrics.efficiency_score > 70 ? 'improving' : 'stable', 0.9),
+      createInsight(createdAt, 'savings', 'Daily Savings',
+        `You saved ${metrics.daily_savings}€ today using solar energy`,
+        metrics.daily_savings, '€', 'improving', 0.85),
     ];
 
     const savingsSummary: SavingsSummary = {
@@ -360,9 +534,14 @@ export class EnergyAnalytics {
   }
 
   /**
-   * Generate hourly energy patterns for optimization
+   * Generate hourly energy patterns for optimization.
+   * The curve only depends on solar capacity, so it is built once per instance.
    */
   private generateEnergyPatterns(): EnergyPattern[] {
+    if (this.energyPatterns) {
+      return this.energyPatterns;
+    }
+
     const patterns: EnergyPattern[] = [];
     
     for (let hour = 0; hour < 24; hour++) {
@@ -397,6 +576,7 @@ export class EnergyAnalytics {
       });
     }
 
+    this.energyPatterns = patterns;
     return patterns;
   }
 
@@ -410,15 +590,7 @@ export class EnergyAnalytics {
 
     // Morning advice
     if (hour >= 7 && hour <= 10) {
-      advice.push({
-        id: 'morning-advice',
-        title_catalan: 'Bon dia! ☀️',
-        description_catalan: 'Els panells solars ja estan produint energia. És un bon moment per preparar l\'esmorzar.',
-        simple_action: 'Posa la cafetera i tosta el pa',
-        timing_recommendation: 'Ara mateix',
-        potential_benefit: 'Energia gratis per començar el dia',
-        priority: 'medium',
-      });
+      advice.push(MORNING_ADVICE);
     }
 
     // High surplus advice
@@ -436,15 +608,7 @@ export class EnergyAnalytics {
 
     // Lunch time advice
     if (hour >= 12 && hour <= 14) {
-      advice.push({
-        id: 'lunch-advice',
-        title_catalan: 'Hora de dinar! 🍽️',
-        description_catalan: 'És el millor moment del dia per cuinar amb energia solar.',
-        simple_action: 'Usa el forn o la vitroceràmica',
-        timing_recommendation: 'Les properes 2 hores',
-        potential_benefit: 'Cuina completament gratis',
-        priority: 'high',
-      });
+      advice.push(LUNCH_ADVICE);
     }
 
     return advice;
@@ -7,7 +7,7 @@
  * Based on the Python automation manager implementation.
  */
 
-import { DatabaseManager } from '@repo/database';
+import { DatabaseManager, getDatabase } from '@repo/database';
 import type {
   Device,
   DevicePriority,
@@ -18,6 +18,33 @@ import type {
   DeviceControl,
   PowerData,
 } from '@repo/types';
+import { createLogger } from './logger';
+
+const logger = createLogger('automation');
+
+// Device priority ranks used for activation/deactivation ordering (higher = more important)
+const PRIORITY_ORDER: Readonly<Record<DevicePriority, number>> = Object.freeze({
+  'essential': 4,
+  'high': 3,
+  'medium': 2,
+  'low': 1,
+});
+
+// Watts held for one millisecond, expressed in kWh
+const KWH_PER_WATT_MS = 1 / (1000 * 60 * 60 * 1000);
+
+// Local midnight of the day containing `time`, in ms
+function startOfDay(time: number): number {
+  const day = new Date(time);
+  day.setHours(0, 0, 0, 0);
+  return day.getTime();
+}
+
+// Reading time in ms, falling back to the wall clock for unparseable timestamps
+function readingTime(powerData: PowerData): number {
+  const parsed = Date.parse(powerData.timestamp);
+  return Number.isNaN(parsed) ? Date.now() : parsed;
+}
 
 export class AutomationManager {
   private db: DatabaseManager;
@@ -25,9 +52,21 @@ export class AutomationManager {
   private automationStats: AutomationStats;
   private lastSurplus: number = 0;
   private minSurplusThreshold: number = 100; // Minimum watts to trigger automation
+  // Devices presorted for each direction; priorities and ratings are fixed, so
+  // these only need rebuilding when the device set changes
+  private activationOrder: Device[] | null = null;
+  private deactivationOrder: Device[] | null = null;
+  // Device list handed out by getDevices(), rebuilt after the device set changes
+  private deviceList: readonly Device[] | null = null;
+  // Inputs of the last evaluated update; device or config changes set `dirty`
+  private lastUpdateKey: string | null = null;
+  private dirty: boolean = true;
+  // Time of the last reading, to integrate automated load between readings
+  private lastUpdateTime: number | null = null;
+  private statsDayStart: number = startOfDay(Date.now());
 
   constructor(dbPath?: string) {
-    this.db = new DatabaseManager(dbPath);
+    this.db = getDatabase(dbPath);
     this.devices = new Map();
     this.automationStats = {
       total_automated_energy: 0,
@@ -120,19 +159,88 @@ export class AutomationManager {
 
     // Load devices into database and memory
     for (const device of defaultDevices) {
-      await this.db.insertDevice(device);
-      this.devices.set(device.id, {
-        ...device,
-        created_at: new Date().toISOString(),
-        updated_at: new Date().toISOString(),
-      });
+      await this.addDevice(device);
+    }
+  }
+
+  /**
+   * Register a device, replacing any existing device with the same ID
+   */
+  async addDevice(device: Omit<Device, 'created_at' | 'updated_at'>): Promise<void> {
+    await this.db.insertDevice(device);
+    const now = new Date().toISOString();
+    this.devices.set(device.id, {
+      ...device,
+      created_at: this.devices.get(device.id)?.created_at ?? now,
+      updated_at: now,
+    });
+    this.invalidateDeviceOrder();
+  }
+
+  /**
+   * Remove a device from automation. Its past automation events are kept.
+   */
+  async removeDevice(deviceId: string): Promise<boolean> {
+    if (!this.devices.delete(deviceId)) {
+      return false;
+    }
+    this.invalidateDeviceOrder();
+    await this.db.deleteDevice(deviceId);
+    return true;
+  }
+
+  /**
+   * Drop the presorted device orders and device list after the device set changes
+   */
+  private invalidateDeviceOrder(): void {
+    this.activationOrder = null;
+    this.deactivationOrder = null;
+    this.deviceList = null;
+    this.dirty = true;
+  }
+
+  /**
+   * Add the energy drawn by automated devices that were on since the last
+   * reading, resetting the daily total when a new day starts. Readings at or
+   * before the last one are ignored so the clock never moves backwards.
+   */
+  private accumulateEnergy(now: number): void {
+    const last = this.lastUpdateTime;
+    if (last !== null && now <= last) {
+      return;
     }
+
+    const dayStart = startOfDay(now);
+    if (dayStart > this.statsDayStart) {
+      this.statsDayStart = dayStart;
+      this.automationStats.energy_saved_today = 0;
+    }
+
+    this.lastUpdateTime = now;
+    if (last === null) {
+      return;
+    }
+
+    let automatedWatts = 0;
+    for (const device of this.devices.values()) {
+      if (device.status === 'on' && device.is_automated) {
+        automatedWatts += device.power_consumption;
+      }
+    }
+
+    const energyKwh = automatedWatts * (now - last) * KWH_PER_WATT_MS;
+    this.automationStats.energy_saved_today += energyKwh;
+    this.automationStats.total_automated_energy += energyKwh;
   }
 
   /**
    * Execute smart automation logic based on current energy data
    */
   async update(powerData: PowerData): Promise<void> {
+    // Devices kept their previous state up to this reading
+    const now = readingTime(powerData);
+    this.accumulateEnergy(now);
+
     const solarProduction = powerData.P_PV;
     const houseConsumption = powerData.P_Load;
     const surplus = solarProduction - houseConsumption;
@@ -140,118 +248,161 @@ export class AutomationManager {
     this.lastSurplus = surplus;
     this.automationStats.last_surplus = surplus;
 
+    // Hour of the reading for time-based decisions, so replayed readings use their own hour
+    const currentHour = new Date(now).getHours();
+
+    // Same reading in the same hour with no device or config change since the
+    // last evaluation: the rules would reach the same decisions, so skip them
+    const updateKey = `${solarProduction}|${houseConsumption}|${currentHour}`;
+    if (updateKey === this.lastUpdateKey && !this.dirty) {
+      return;
+    }
+    this.lastUpdateKey = updateKey;
+    this.dirty = false;
+
     // Only perform automation if surplus is significant
     if (Math.abs(surplus) < this.minSurplusThreshold) {
       return;
     }
-
-    // Get current hour for time-based decisions
-    const currentHour = new Date().getHours();
     
     // Apply automation rules based on surplus and priority
     if (surplus > 0) {
-      await this.handleSolarSurplus(surplus, currentHour);
+      const activated = await this.handleSolarSurplus(surplus, currentHour);
+      if (activated.length > 0) {
+        logger.info(`Solar surplus ${Math.round(surplus)}W, activated: ${activated.join(', ')}`);
+      }
     } else {
-      await this.handleEnergyDeficit(Math.abs(surplus), currentHour);
+      const deactivated = await this.handleEnergyDeficit(Math.abs(surplus), currentHour);
+      if (deactivated.length > 0) {
+        logger.info(`Energy deficit ${Math.round(-surplus)}W, deactivated: ${deactivated.join(', ')}`);
+      }
     }
 
     // Update active devices count
-    this.automationStats.active_devices = Array.from(this.devices.values())
-      .filter(device => device.status === 'on' && device.is_automated).length;
+    let activeDevices = 0;
+    for (const device of this.devices.values()) {
+      if (device.status === 'on' && device.is_automated) activeDevices++;
+    }
+    this.automationStats.active_devices = activeDevices;
   }
 
   /**
-   * Handle situations with solar energy surplus
+   * Process a run of readings in time order (e.g. a replay or a backlog) in
+   * one call. Device state only changes on evaluation, so the energy over the
+   * whole span follows from its endpoints and only the latest reading is evaluated.
+   * Readings at or before the last one already processed are skipped.
    */
-  private async handleSolarSurplus(surplus: number, currentHour: number): Promise<void> {
+  async updateBatch(samples: readonly PowerData[]): Promise<void> {
+    const last = this.lastUpdateTime;
+    const fresh = last === null ? samples : samples.filter(sample => readingTime(sample) > last);
+    if (fresh.length === 0) {
+      return;
+    }
+
+    // Start the energy span at the first sample if nothing was seen before
+    if (last === null) {
+      this.accumulateEnergy(readingTime(fresh[0]!));
+    }
+
+    await this.update(fresh[fresh.length - 1]!);
+  }
+
+  /**
+   * Handle situations with solar energy surplus. Returns the names of the
+   * devices that were switched on.
+   */
+  private async handleSolarSurplus(surplus: number, currentHour: number): Promise<string[]> {
     // Get available devices sorted by priority and power consumption
     const availableDevices = this.getAvailableDevicesForActivation();
+    const selected: Device[] = [];
+    const minThreshold = this.minSurplusThreshold;
     
     let remainingSurplus = surplus;
     
     for (const device of availableDevices) {
       // Check if device can be activated based on surplus and time constraints
       if (this.canActivateDevice(device, remainingSurplus, currentHour)) {
-        await this.activateDevice(device.id, `Solar surplus: ${Math.round(surplus)}W`);
+        selected.push(device);
         remainingSurplus -= device.power_consumption;
         
         // If remaining surplus is too small, stop activating devices
-        if (remainingSurplus < this.minSurplusThreshold) {
+        if (remainingSurplus < minThreshold) {
           break;
         }
       }
     }
+
+    // Decisions only depend on the surplus, so switch the chosen devices concurrently
+    const reason = `Solar surplus: ${Math.round(surplus)}W`;
+    const results = await Promise.all(selected.map(device => this.activateDevice(device.id, reason)));
+    return selected.filter((_, i) => results[i]).map(device => device.name);
   }
 
   /**
-   * Handle situations with energy deficit (consuming more than producing)
+   * Handle situations with energy deficit (consuming more than producing).
+   * Returns the names of the devices that were switched off.
    */
-  private async handleEnergyDeficit(deficit: number, currentHour: number): Promise<void> {
+  private async handleEnergyDeficit(deficit: number, currentHour: number): Promise<string[]> {
     // Get active automated devices sorted by priority (lowest priority first)
     const activeDevices = this.getActiveAutomatedDevices();
+    const selected: Device[] = [];
+    const minThreshold = this.minSurplusThreshold;
     
     let remainingDeficit = deficit;
     
     for (const device of activeDevices) {
       // Deactivate non-essential devices during high deficit
       if (this.shouldDeactivateDevice(device, remainingDeficit, currentHour)) {
-        await this.deactivateDevice(device.id, `Energy deficit: ${Math.round(deficit)}W`);
+        selected.push(device);
         remainingDeficit -= device.power_consumption;
         
         // If deficit is manageable, stop deactivating devices
-        if (remainingDeficit < this.minSurplusThreshold) {
+        if (remainingDeficit < minThreshold) {
           break;
         }
       }
     }
+
+    const reason = `Energy deficit: ${Math.round(deficit)}W`;
+    const results = await Promise.all(selected.map(device => this.deactivateDevice(device.id, reason)));
+    return selected.filter((_, i) => results[i]).map(device => device.name);
   }
 
   /**
    * Get available devices for activation, sorted by priority and efficiency
    */
   private getAvailableDevicesForActivation(): Device[] {
-    const priorityOrder: Record<DevicePriority, number> = {
-      'essential': 4,
-      'high': 3,
-      'medium': 2,
-      'low': 1,
-    };
-
-    return Array.from(this.devices.values())
-      .filter(device => 
-        device.status === 'off' && 
-        device.is_automated && 
-        !device.manual_override
-      )
-      .sort((a, b) => {
-        // Sort by priority first, then by power consumption (lower consumption first)
-        const priorityDiff = priorityOrder[b.priority] - priorityOrder[a.priority];
+    if (!this.activationOrder) {
+      // Sort by priority first, then by power consumption (lower consumption first)
+      this.activationOrder = Array.from(this.devices.values()).sort((a, b) => {
+        const priorityDiff = PRIORITY_ORDER[b.priority] - PRIORITY_ORDER[a.priority];
         if (priorityDiff !== 0) return priorityDiff;
         return a.power_consumption - b.power_consumption;
       });
+    }
+
+    return this.activationOrder.filter(device => 
+      device.status === 'off' && 
+      device.is_automated && 
+      !device.manual_override
+    );
   }
 
   /**
    * Get active automated devices, sorted by priority (lowest first for deactivation)
    */
   private getActiveAutomatedDevices(): Device[] {
-    const priorityOrder: Record<DevicePriority, number> = {
-      'essential': 4,
-      'high': 3,
-      'medium': 2,
-      'low': 1,
-    };
+    if (!this.deactivationOrder) {
+      // Sort by priority (lowest first for deactivation)
+      this.deactivationOrder = Array.from(this.devices.values())
+        .sort((a, b) => PRIORITY_ORDER[a.priority] - PRIORITY_ORDER[b.priority]);
+    }
 
-    return Array.from(this.devices.values())
-      .filter(device => 
-        device.status === 'on' && 
-        device.is_automated && 
-        !device.manual_override
-      )
-      .sort((a, b) => {
-        // Sort by priority (lowest first for deactivation)
-        return priorityOrder[a.priority] - priorityOrder[b.priority];
-      });
+    return this.deactivationOrder.filter(device => 
+      device.status === 'on' && 
+      device.is_automated && 
+      !device.manual_override
+    );
   }
 
   /**
@@ -323,15 +474,15 @@ export class AutomationManager {
       return false;
     }
 
+    // A switch attempt, successful or not, changes what the next update should decide
+    this.dirty = true;
+
     try {
       // Update device status
       device.status = 'on';
       device.updated_at = new Date().toISOString();
       this.devices.set(deviceId, device);
       
-      // Update database
-      await this.db.insertDevice(device);
-
       // Log automation event
       const event: AutomationEvent = {
         id: `evt-${Date.now()}-${deviceId}`,
@@ -342,17 +493,20 @@ export class AutomationManager {
         timestamp: new Date().toISOString(),
         success: true,
       };
-      
-      await this.db.insertAutomationEvent(event);
+
+      // Persist the device state and the event together
+      await Promise.all([
+        this.db.insertDevice(device),
+        this.db.insertAutomationEvent(event),
+      ]);
       
       // Update statistics
       this.automationStats.automation_events++;
-      this.automationStats.energy_saved_today += device.power_consumption / 1000; // Convert to kWh
 
-      console.log(`✅ Activated ${device.name}: ${reason}`);
+      logger.debug(`Activated ${device.name}: ${reason}`);
       return true;
     } catch (error) {
-      console.error(`❌ Failed to activate ${device.name}:`, error);
+      logger.error(`Failed to activate ${device.name}:`, error);
       return false;
     }
   }
@@ -366,15 +520,15 @@ export class AutomationManager {
       return false;
     }
 
+    // A switch attempt, successful or not, changes what the next update should decide
+    this.dirty = true;
+
     try {
       // Update device status
       device.status = 'off';
       device.updated_at = new Date().toISOString();
       this.devices.set(deviceId, device);
       
-      // Update database
-      await this.db.insertDevice(device);
-
       // Log automation event
       const event: AutomationEvent = {
         id: `evt-${Date.now()}-${deviceId}`,
@@ -385,16 +539,20 @@ export class AutomationManager {
         timestamp: new Date().toISOString(),
         success: true,
       };
-      
-      await this.db.insertAutomationEvent(event);
+
+      // Persist the device state and the event together
+      await Promise.all([
+        this.db.insertDevice(device),
+        this.db.insertAutomationEvent(event),
+      ]);
       
       // Update statistics
       this.automationStats.automation_events++;
 
-      console.log(`⏹️ Deactivated ${device.name}: ${reason}`);
+      logger.debug(`Deactivated ${device.name}: ${reason}`);
       return true;
     } catch (error) {
-      console.error(`❌ Failed to deactivate ${device.name}:`, error);
+      logger.error(`Failed to deactivate ${device.name}:`, error);
       return false;
     }
   }
@@ -411,6 +569,7 @@ export class AutomationManager {
     const newStatus: DeviceStatus = control.action === 'turn_on' ? 'on' : 'off';
     
     // Update device
+    this.dirty = true;
     device.status = newStatus;
     device.manual_override = control.manual;
     device.updated_at = new Date().toISOString();
@@ -436,10 +595,14 @@ export class AutomationManager {
   }
 
   /**
-   * Get all managed devices
+   * Get all managed devices. The list is shared between calls and only
+   * rebuilt when devices are added or removed; device state stays live.
    */
-  getDevices(): Device[] {
-    return Array.from(this.devices.values());
+  getDevices(): readonly Device[] {
+    if (!this.deviceList) {
+      this.deviceList = Object.freeze(Array.from(this.devices.values()));
+    }
+    return this.deviceList;
   }
 
   /**
@@ -469,6 +632,7 @@ export class AutomationManager {
   async clearManualOverrides(): Promise<void> {
     for (const device of this.devices.values()) {
       if (device.manual_override) {
+        this.dirty = true;
         device.manual_override = false;
         device.updated_at = new Date().toISOString();
         await this.db.insertDevice(device);
@@ -534,6 +698,8 @@ export class AutomationManager {
     minSurplusThreshold?: number;
     enabledCategories?: DeviceCategory[];
   }): void {
+    this.dirty = true;
+
     if (config.minSurplusThreshold !== undefined) {
       this.minSurplusThreshold = config.minSurplusThreshold;
     }
@@ -6,12 +6,23 @@
  * Based on the Python implementation with real inverter communication.
  */
 
-import axios from 'axios';
+import axios, { type AxiosInstance } from 'axios';
+import { Agent } from 'http';
+import { createConnection } from 'net';
 import type { PowerData } from '@repo/types';
+import { createLogger } from './logger';
+
+const logger = createLogger('fronius');
 
 export interface FroniusApiResponse {
   Body: {
     Data: {
+      // PowerFlow realtime data reports site totals in watts (null when unavailable)
+      Site?: {
+        P_PV?: number | null;
+        P_Load?: number | null;
+        P_Grid?: number | null;
+      };
       PAC?: {
         Values: {
           '1': number;
@@ -47,11 +58,26 @@ export class FroniusClient {
   private host: string;
   private timeout: number;
   private deviceId: string;
+  private http: AxiosInstance;
+  private port: number = 80;
+  private probeTimeout: number = 250; // ms
+  private availabilityTtl: number = 5000; // ms
+  private availability: { available: boolean; checkedAt: number } | null = null;
 
   constructor(host: string = '192.168.1.128', timeout: number = 10000) {
     this.host = host;
     this.timeout = timeout;
     this.deviceId = '1'; // Default device ID for Fronius inverters
+
+    // Keep-alive agent so polls reuse the TCP connection to the inverter.
+    // Payloads are a few KB on the LAN, so ask for them uncompressed; axios
+    // still decodes the body if a firmware compresses it anyway.
+    this.http = axios.create({
+      baseURL: `http://${this.host}/solar_api/v1`,
+      timeout: this.timeout,
+      httpAgent: new Agent({ keepAlive: true, maxSockets: 4 }),
+      headers: { 'Accept-Encoding': 'identity' },
+    });
   }
 
   /**
@@ -59,37 +85,57 @@ export class FroniusClient {
    */
   async testConnection(): Promise<boolean> {
     try {
-      const response = await axios.get(
-        `http://${this.host}/solar_api/v1/GetInverterInfo.cgi`,
-        { timeout: this.timeout }
-      );
+      const response = await this.http.get('/GetInverterInfo.cgi');
       return response.status === 200;
     } catch (error) {
-      console.log(`Fronius connection test failed: ${error}`);
+      logger.debug(`Fronius connection test failed: ${error}`);
       return false;
     }
   }
 
   /**
-   * Get current power data from the Fronius inverter
+   * Cheap reachability check: a TCP connect to the inverter's web port instead
+   * of a full HTTP request. Results are reused for a few seconds.
+   */
+  async isAvailable(): Promise<boolean> {
+    const cached = this.availability;
+    if (cached && Date.now() - cached.checkedAt < this.availabilityTtl) {
+      return cached.available;
+    }
+
+    const available = await new Promise<boolean>((resolve) => {
+      const socket = createConnection({ host: this.host, port: this.port });
+      const finish = (result: boolean) => {
+        socket.destroy();
+        resolve(result);
+      };
+      socket.setTimeout(this.probeTimeout);
+      socket.once('connect', () => finish(true));
+      socket.once('timeout', () => finish(false));
+      socket.once('error', () => finish(false));
+    });
+
+    this.availability = { available, checkedAt: Date.now() };
+    return available;
+  }
+
+  /**
+   * Get current power data from the Fronius inverter. Aborting `signal`
+   * cancels the request and frees its connection.
    */
-  async getCurrentData(): Promise<PowerData> {
+  async getCurrentData(signal?: AbortSignal): Promise<PowerData> {
     try {
-      const response = await axios.get<FroniusApiResponse>(
-        `http://${this.host}/solar_api/v1/GetPowerFlowRealtimeData.fcgi`,
-        { timeout: this.timeout }
-      );
+      const response = await this.http.get<FroniusApiResponse>('/GetPowerFlowRealtimeData.fcgi', { signal });
 
       if (response.data.Head.Status.Code !== 0) {
         throw new Error(`Fronius API error: ${response.data.Head.Status.Reason}`);
       }
 
-      const data = response.data.Body.Data;
-      
-      // Extract power values with defaults
-      const P_PV = data.P_PV?.Values?.['1'] || 0;
-      const P_Load = data.P_Load?.Values?.['1'] || 0;
-      const P_Grid = data.P_Grid?.Values?.['1'] || 0;
+      // Resolve the site block once, then read the three fields from it
+      const site = response.data.Body?.Data?.Site ?? {};
+      const P_PV = site.P_PV ?? 0;
+      const P_Load = site.P_Load ?? 0;
+      const P_Grid = site.P_Grid ?? 0;
 
       return {
         P_PV: Math.max(0, P_PV), // Solar production (always positive)
@@ -98,7 +144,10 @@ export class FroniusClient {
         timestamp: new Date().toISOString(),
       };
     } catch (error) {
-      console.error(`Failed to get Fronius data: ${error}`);
+      // A cancelled read was abandoned by the caller, not a communication failure
+      if (!axios.isCancel(error)) {
+        logger.error(`Failed to get Fronius data: ${error}`);
+      }
       throw new Error(`Fronius communication failed: ${error}`);
     }
   }
@@ -108,13 +157,10 @@ export class FroniusClient {
    */
   async getInverterInfo(): Promise<any> {
     try {
-      const response = await axios.get(
-        `http://${this.host}/solar_api/v1/GetInverterInfo.cgi`,
-        { timeout: this.timeout }
-      );
+      const response = await this.http.get('/GetInverterInfo.cgi');
       return response.data;
     } catch (error) {
-      console.error(`Failed to get inverter info: ${error}`);
+      logger.error(`Failed to get inverter info: ${error}`);
       throw error;
     }
   }
@@ -124,13 +170,12 @@ export class FroniusClient {
    */
   async getHistoricalData(date: string): Promise<any> {
     try {
-      const response = await axios.get(
-        `http://${this.host}/solar_api/v1/GetArchiveData.cgi?Scope=Device&DeviceId=${this.deviceId}&StartDate=${date}&EndDate=${date}`,
-        { timeout: this.timeout }
+      const response = await this.http.get(
+        `/GetArchiveData.cgi?Scope=Device&DeviceId=${this.deviceId}&StartDate=${date}&EndDate=${date}`
       );
       return response.data;
     } catch (error) {
-      console.error(`Failed to get historical data: ${error}`);
+      logger.error(`Failed to get historical data: ${error}`);
       throw error;
     }
   }
@@ -157,7 +202,7 @@ export class FroniusClient {
     errorCount: number;
   }> {
     try {
-      const isOnline = await this.testConnection();
+      const isOnline = await this.isAvailable();
       const isProducing = isOnline ? await this.isProducing() : false;
       
       return {
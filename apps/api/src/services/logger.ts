@@ -0,0 +1,63 @@
+/**
+ * Logger - Leveled Console Logging
+ * ================================
+ *
+ * Thin console wrapper that honours the configured log level and quiet mode.
+ * Messages below the active level return before anything is formatted.
+ */
+
+import { config } from '@repo/config';
+
+type LogLevel = 'DEBUG' | 'INFO' | 'WARNING' | 'ERROR';
+
+const LEVEL_RANK: Record<LogLevel, number> = {
+  DEBUG: 10,
+  INFO: 20,
+  WARNING: 30,
+  ERROR: 40,
+};
+
+export class Logger {
+  private scope: string;
+  private minRank: number;
+
+  constructor(scope: string) {
+    this.scope = scope;
+
+    // Quiet mode keeps only errors, whatever the configured level
+    const level = String(config.logging.level).toUpperCase() as LogLevel;
+    this.minRank = config.logging.quiet_mode
+      ? LEVEL_RANK.ERROR
+      : LEVEL_RANK[level] ?? LEVEL_RANK.INFO;
+  }
+
+  /**
+   * Check whether a level would be written, to skip building expensive messages
+   */
+  isEnabled(level: LogLevel): boolean {
+    return LEVEL_RANK[level] >= this.minRank;
+  }
+
+  debug(message: string, ...details: unknown[]): void {
+    if (this.isEnabled('DEBUG')) console.debug(`[${this.scope}] ${message}`, ...details);
+  }
+
+  info(message: string, ...details: unknown[]): void {
+    if (this.isEnabled('INFO')) console.log(`[${this.scope}] ${message}`, ...details);
+  }
+
+  warn(message: string, ...details: unknown[]): void {
+    if (this.isEnabled('WARNING')) console.warn(`[${this.scope}] ${message}`, ...details);
+  }
+
+  error(message: string, ...details: unknown[]): void {
+    if (this.isEnabled('ERROR')) console.error(`[${this.scope}] ${message}`, ...details);
+  }
+}
+
+// Export factory function
+export function createLogger(scope: string): Logger {
+  return new Logger(scope);
+}
+
+export default Logger;
@@ -11,6 +11,28 @@ import { FroniusClient } from './fronius';
 import { EnhancedMockFroniusClient } from './enhanced-mock-fronius';
 import type { PowerData, WeatherData } from '@repo/types';
 import { config } from '@repo/config';
+import { createLogger } from './logger';
+
+const logger = createLogger('smart-fronius');
+
+// A real reading this recent is served again when the inverter is merely slow
+const LAST_REAL_READING_MAX_AGE_MS = 30 * 1000;
+
+// Raised when a real inverter read misses its deadline, as opposed to failing outright
+class ReadTimeoutError extends Error {}
+
+// One enhanced mock per process, shared by every SmartFroniusClient
+let sharedMockClient: EnhancedMockFroniusClient | null = null;
+
+function getSharedMockClient(): EnhancedMockFroniusClient {
+  if (!sharedMockClient) {
+    sharedMockClient = new EnhancedMockFroniusClient(
+      config.solar.capacityWatts,
+      config.solar.location
+    );
+  }
+  return sharedMockClient;
+}
 
 export enum FroniusMode {
   REAL = 'real',
@@ -28,19 +50,27 @@ export interface FroniusStatus {
 
 export class SmartFroniusClient {
   private realClient?: FroniusClient;
-  private enhancedMockClient: EnhancedMockFroniusClient;
   private currentMode: FroniusMode;
   private status: FroniusStatus;
   private maxRetries: number = 3;
   private retryDelay: number = 1000; // ms
   private connectionTestInterval: number = 60000; // 1 minute
+  private realReadTimeout: number;
+  private cacheTtl: number;
+  private dataCache: { data: PowerData; expiresAt: number } | null = null;
+  private lastRealReading: { data: PowerData; readAt: number } | null = null;
+  private monitorTimer?: ReturnType<typeof setInterval>;
+  private monitorInFlight: boolean = false;
 
-  constructor() {
-    // Initialize clients
-    this.enhancedMockClient = new EnhancedMockFroniusClient(
-      config.solar.capacityWatts,
-      config.solar.location
-    );
+  /**
+   * @param cacheTtl How long a reading is reused, in ms. The inverter only
+   *   refreshes about once a second, so faster polls share one upstream call.
+   * @param realReadTimeout How long a poll waits on the real inverter, in ms.
+   *   Past it the last real reading is served while the read carries on.
+   */
+  constructor(cacheTtl: number = 1000, realReadTimeout: number = 5000) {
+    this.cacheTtl = cacheTtl;
+    this.realReadTimeout = realReadTimeout;
 
     // Try to initialize real client if enabled
     if (config.fronius.enabled && config.fronius.host) {
@@ -64,32 +94,62 @@ export class SmartFroniusClient {
     this.startConnectionMonitoring();
   }
 
+  /**
+   * Enhanced mock, created on first use and shared across clients. With a
+   * reachable real inverter the mock is never needed, so it is not built up front.
+   */
+  private get enhancedMockClient(): EnhancedMockFroniusClient {
+    return getSharedMockClient();
+  }
+
   /**
    * Get current power data with automatic fallback
    */
   async getCurrentData(weather?: WeatherData): Promise<PowerData> {
+    const cached = this.dataCache;
+    if (cached && Date.now() < cached.expiresAt) {
+      return { ...cached.data };
+    }
+
     for (let mode of this.getFallbackSequence()) {
       try {
         const data = await this.getCurrentDataFromMode(mode, weather);
         
         // Update status on success
         this.updateStatus(mode, true);
+        this.dataCache = { data: { ...data }, expiresAt: Date.now() + this.cacheTtl };
+        if (mode === FroniusMode.REAL) {
+          this.lastRealReading = { data: { ...data }, readAt: Date.now() };
+        }
         return data;
         
       } catch (error) {
-        console.warn(`Failed to get power data from ${mode}:`, error);
+        // A slow reply from an inverter that answered recently is not an outage:
+        // keep REAL mode and serve the last real reading
+        const lastReal = this.lastRealReading;
+        if (
+          mode === FroniusMode.REAL &&
+          error instanceof ReadTimeoutError &&
+          lastReal &&
+          Date.now() - lastReal.readAt < LAST_REAL_READING_MAX_AGE_MS
+        ) {
+          logger.debug(`${error.message}, serving the last real reading`);
+          return { ...lastReal.data };
+        }
+
+        logger.warn(`Failed to get power data from ${mode}:`, error);
         this.updateStatus(mode, false, error instanceof Error ? error.message : 'Unknown error');
         
         // If this was the real client, fall back to mock
         if (mode === FroniusMode.REAL) {
-          console.log('Real inverter unavailable, falling back to enhanced mock');
+          logger.info('Real inverter unavailable, falling back to enhanced mock');
           this.currentMode = FroniusMode.ENHANCED_MOCK;
         }
       }
     }
 
     // Ultimate fallback to basic mock
-    console.warn('All Fronius clients failed, using basic mock');
+    logger.warn('All Fronius clients failed, using basic mock');
     this.currentMode = FroniusMode.BASIC_MOCK;
     return this.getBasicMockData();
   }
@@ -103,7 +163,14 @@ export class SmartFroniusClient {
         if (!this.realClient) {
           throw new Error('Real Fronius client not available');
         }
-        return await this.realClient.getCurrentData();
+        // A slow inverter should not stall the poll; past the deadline the
+        // last real reading is served, or the mock if there is none recent
+        const realClient = this.realClient;
+        return await this.withTimeout(
+          signal => realClient.getCurrentData(signal),
+          this.realReadTimeout,
+          'Real inverter read'
+        );
 
       case FroniusMode.ENHANCED_MOCK:
         return await this.enhancedMockClient.getCurrentData(weather);
@@ -116,6 +183,22 @@ export class SmartFroniusClient {
     }
   }
 
+  /**
+   * Reject if the task has not settled within `ms`, aborting it through its
+   * signal so a slow request does not keep holding a pooled connection.
+   */
+  private withTimeout<T>(task: (signal: AbortSignal) => Promise<T>, ms: number, label: string): Promise<T> {
+    const controller = new AbortController();
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    const timeout = new Promise<never>((_, reject) => {
+      timer = setTimeout(() => {
+        controller.abort();
+        reject(new ReadTimeoutError(`${label} timed out after ${ms}ms`));
+      }, ms);
+    });
+    return Promise.race([task(controller.signal), timeout]).finally(() => clearTimeout(timer));
+  }
+
   /**
    * Get fallback sequence based on current mode and availability
    */
@@ -181,14 +264,19 @@ export class SmartFroniusClient {
     }
 
     try {
+      // Skip the HTTP round trip when the inverter does not even accept a TCP connection
+      if (!(await this.realClient.isAvailable())) {
+        return false;
+      }
+
       const isConnected = await this.realClient.testConnection();
       if (isConnected && this.currentMode !== FroniusMode.REAL) {
-        console.log('Real inverter reconnected, switching back');
+        logger.info('Real inverter reconnected, switching back');
         this.currentMode = FroniusMode.REAL;
       }
       return isConnected;
     } catch (error) {
-      console.warn('Real inverter connection test failed:', error);
+      logger.warn('Real inverter connection test failed:', error);
       return false;
     }
   }
@@ -210,24 +298,36 @@ export class SmartFroniusClient {
    * Start background connection monitoring
    */
   private startConnectionMonitoring(): void {
-    setInterval(async () => {
-      if (this.currentMode !== FroniusMode.REAL && this.realClient) {
-        // Periodically test if real inverter is back online
+    // Runs off the request path, so polls only read currentMode. unref() keeps
+    // the timer from holding the process open on shutdown.
+    this.monitorTimer = setInterval(async () => {
+      if (this.monitorInFlight || this.currentMode === FroniusMode.REAL || !this.realClient) {
+        return;
+      }
+
+      // Periodically test if real inverter is back online, one probe at a time
+      this.monitorInFlight = true;
+      try {
         const isConnected = await this.testConnection();
         if (isConnected) {
-          console.log('Real inverter is back online');
+          logger.info('Real inverter is back online');
           this.currentMode = FroniusMode.REAL;
         }
+      } finally {
+        this.monitorInFlight = false;
       }
     }, this.connectionTestInterval);
+    this.monitorTimer.unref?.();
   }
 
   /**
    * Manually set mode (for testing/debugging)
    */
   setMode(mode: FroniusMode): void {
-    console.log(`Manually switching to ${mode} mode`);
+    logger.debug(`Manually switching to ${mode} mode`);
     this.currentMode = mode;
+    this.dataCache = null;
+    this.lastRealReading = null;
     this.status.mode = mode;
   }
 
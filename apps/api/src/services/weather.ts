@@ -9,7 +9,7 @@
 
 import axios from 'axios';
 import type { WeatherData, WeatherForecast, WeatherApiResponse, SolarForecast } from '@repo/types';
-import { DatabaseManager } from '@repo/database';
+import { DatabaseManager, getDatabase } from '@repo/database';
 
 export class WeatherService {
   private apiBaseUrl: string;
@@ -18,6 +18,7 @@ export class WeatherService {
   private cacheKey: string;
   private lastFetchTime: number = 0;
   private cacheDuration: number = 30 * 60 * 1000; // 30 minutes
+  private forecastCache: WeatherForecast[] = [];
 
   constructor(dbPath?: string) {
     this.apiBaseUrl = 'https://api.open-meteo.com/v1/forecast';
@@ -26,7 +27,7 @@ export class WeatherService {
       longitude: 1.0968,
       name: 'Agramunt, Spain'
     };
-    this.db = new DatabaseManager(dbPath);
+    this.db = getDatabase(dbPath);
     this.cacheKey = `weather_${this.location.latitude}_${this.location.longitude}`;
   }
 
@@ -89,6 +90,11 @@ export class WeatherService {
    * Get weather forecast for the next 7 days
    */
   async getWeatherForecast(days: number = 7): Promise<WeatherForecast[]> {
+    // Forecasts only change a few times a day; serve recent fetches from memory
+    if (this.isCacheValid() && this.forecastCache.length >= days) {
+      return this.forecastCache.slice(0, days);
+    }
+
     try {
       const response = await axios.get<WeatherApiResponse>(this.apiBaseUrl, {
         params: {
@@ -135,11 +141,16 @@ export class WeatherService {
         };
 
         forecasts.push(forecast);
-        
-        // Store in database
-        this.db.insertWeatherForecast(forecast);
       }
 
+      // Store in database as one transaction; a failed write must not lose the fresh forecast
+      this.db.insertWeatherForecasts(forecasts).catch(error => {
+        console.error('Failed to store weather forecast:', error);
+      });
+
+      this.forecastCache = forecasts;
+      this.lastFetchTime = Date.now();
+
       return forecasts;
     } catch (error) {
       console.error('Failed to fetch weather forecast:', error);
@@ -84,6 +84,30 @@ interface FroniusStatus {
   errorCount?: number;
 }
 
+// Surplus-based usage tips, one per band: > 1000 W, > 500 W, > 0 W, otherwise
+const USAGE_TIP_THRESHOLDS: readonly number[] = [1000, 500, 0];
+const USAGE_TIPS: Record<'en' | 'ca', readonly string[]> = {
+  ca: [
+    '💡 Bon moment per posar la rentadora o planxar',
+    '🔥 Podeu escalfar aigua o cuinar sense cost',
+    '📱 Energia gratuïta per carregar dispositius',
+    '⚡ Intenteu reduir el consum ara',
+  ],
+  en: [
+    '💡 Great time to run washing machine or iron',
+    '🔥 You can heat water or cook for free',
+    '📱 Free energy to charge devices',
+    '⚡ Try to reduce consumption now',
+  ],
+};
+
+/** Index of the first threshold the surplus exceeds (thresholds are descending) */
+function surplusBand(surplus: number): number {
+  let band = 0;
+  while (band < USAGE_TIP_THRESHOLDS.length && surplus <= USAGE_TIP_THRESHOLDS[band]!) band++;
+  return band;
+}
+
 // Clean scenario generator - Shows ACTUAL energy flows clearly
 function generateMockEnergyData(): EnergyData {
   const now = new Date();
@@ -788,18 +812,7 @@ export default function SolarEnergyDashboard() {
     // Fallback to energy-based tips
     if (!energyData) return '';
     const surplus = energyData.solarProduction - energyData.consumption;
-    
-    if (language === 'ca') {
-      if (surplus > 1000) return '💡 Bon moment per posar la rentadora o planxar';
-      if (surplus > 500) return '🔥 Podeu escalfar aigua o cuinar sense cost';
-      if (surplus > 0) return '📱 Energia gratuïta per carregar dispositius';
-      return '⚡ Intenteu reduir el consum ara';
-    } else {
-      if (surplus > 1000) return '💡 Great time to run washing machine or iron';
-      if (surplus > 500) return '🔥 You can heat water or cook for free';
-      if (surplus > 0) return '📱 Free energy to charge devices';
-      return '⚡ Try to reduce consumption now';
-    }
+    return USAGE_TIPS[language][surplusBand(surplus)]!;
   };
 
   const openForecastModal = (day: any) => {
@@ -844,24 +857,6 @@ export default function SolarEnergyDashboard() {
     }
   };
 
-  // Determine scenario for background color (reuse logic from PowerFlowCardPlus)
-  function getEnergyScenario(solarToHome: number, solarToGrid: number, gridToHome: number) {
-    if (solarToGrid > 0 && solarToHome > 0 && gridToHome === 0) return 'selling'; // Green
-    if (solarToGrid === 0 && solarToHome > 0 && gridToHome === 0) return 'solarOnly'; // Yellow
-    if (solarToHome > 0 && gridToHome > 0) return 'mix'; // Orange
-    if (solarToHome === 0 && gridToHome > 0) return 'gridOnly'; // Red
-    return 'unknown';
-  }
-
-  // Calculate scenario from energyData (in W)
-  let scenario = 'unknown';
-  if (energyData) {
-    const solarToHome = Math.max(Math.min(energyData.solarProduction, energyData.consumption), 0);
-    const solarToGrid = Math.max(energyData.solarProduction - energyData.consumption, 0);
-    const gridToHome = Math.max(energyData.consumption - energyData.solarProduction, 0);
-    scenario = getEnergyScenario(solarToHome, solarToGrid, gridToHome);
-  }
-
   const bgColor = energyData
     ? getFlowColor({ solar: energyData.solarProduction, home: energyData.consumption })
     : '#222'; // fallback
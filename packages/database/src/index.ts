@@ -13,6 +13,7 @@ import { promisify } from 'util';
 import type {
   EnergyRecord,
   DailyEnergyRecord,
+  HourlyEnergyTotals,
   WeatherData,
   WeatherForecast,
   Device,
@@ -21,15 +22,188 @@ import type {
   EnergyInsight,
 } from '@repo/types';
 
+const DEFAULT_DB_PATH = 'data/energy_data.db';
+
+// Full schema, applied as a single script
+const SCHEMA_SQL = `
+  -- Energy tables
+  -- Main energy production and consumption data (5-minute intervals)
+  CREATE TABLE IF NOT EXISTS energy (
+    timestamp TEXT PRIMARY KEY,
+    production REAL NOT NULL,
+    consumption REAL NOT NULL,
+    grid_import REAL DEFAULT 0,
+    grid_export REAL DEFAULT 0,
+    self_consumption_rate REAL,
+    autonomy_rate REAL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+  );
+  -- Daily energy summaries
+  CREATE TABLE IF NOT EXISTS daily_energy (
+    date TEXT PRIMARY KEY,
+    total_production REAL NOT NULL,
+    total_consumption REAL NOT NULL,
+    total_grid_import REAL DEFAULT 0,
+    total_grid_export REAL DEFAULT 0,
+    peak_production REAL DEFAULT 0,
+    peak_consumption REAL DEFAULT 0,
+    self_consumption_rate REAL DEFAULT 0,
+    autonomy_rate REAL DEFAULT 0,
+    efficiency_score REAL DEFAULT 0,
+    savings_euros REAL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+  );
+  -- Create indexes for performance
+  CREATE INDEX IF NOT EXISTS idx_energy_timestamp ON energy(timestamp);
+  CREATE INDEX IF NOT EXISTS idx_daily_energy_date ON daily_energy(date);
+
+  -- Weather tables
+  -- Weather forecast data
+  CREATE TABLE IF NOT EXISTS weather_forecast (
+    date TEXT,
+    location TEXT,
+    temperature_min REAL,
+    temperature_max REAL,
+    cloud_cover REAL,
+    uv_index REAL,
+    solar_radiation REAL,
+    precipitation_probability REAL,
+    wind_speed REAL,
+    weather_code INTEGER,
+    weather_description TEXT,
+    expected_solar_production REAL,
+    forecast_created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, location)
+  );
+  -- Current weather data
+  CREATE TABLE IF NOT EXISTS weather_current (
+    timestamp TEXT,
+    location TEXT,
+    temperature REAL,
+    humidity REAL,
+    cloud_cover REAL,
+    uv_index REAL,
+    solar_radiation REAL,
+    wind_speed REAL,
+    precipitation REAL,
+    weather_description TEXT,
+    PRIMARY KEY (timestamp, location)
+  );
+  CREATE INDEX IF NOT EXISTS idx_weather_forecast_date ON weather_forecast(date);
+  -- Serves "WHERE location = ? ORDER BY date" without a sort step
+  CREATE INDEX IF NOT EXISTS idx_weather_forecast_location_date ON weather_forecast(location, date);
+  CREATE INDEX IF NOT EXISTS idx_weather_current_timestamp ON weather_current(timestamp);
+
+  -- Automation tables
+  -- Device registry
+  CREATE TABLE IF NOT EXISTS devices (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    power_consumption REAL NOT NULL,
+    priority TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    is_automated BOOLEAN DEFAULT 0,
+    description TEXT,
+    location TEXT,
+    manual_override BOOLEAN DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+  );
+  -- Automation events log
+  CREATE TABLE IF NOT EXISTS automation_events (
+    id TEXT PRIMARY KEY,
+    device_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    trigger_reason TEXT NOT NULL,
+    surplus_watts REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    success BOOLEAN NOT NULL,
+    error_message TEXT,
+    FOREIGN KEY (device_id) REFERENCES devices (id)
+  );
+  CREATE INDEX IF NOT EXISTS idx_automation_events_device_id ON automation_events(device_id);
+  CREATE INDEX IF NOT EXISTS idx_automation_events_timestamp ON automation_events(timestamp);
+
+  -- Analytics tables
+  -- Optimization insights
+  CREATE TABLE IF NOT EXISTS optimization_insights (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    potential_savings_kwh REAL DEFAULT 0,
+    potential_savings_euros REAL DEFAULT 0,
+    actionable BOOLEAN DEFAULT 1,
+    context TEXT,
+    is_elderly_friendly BOOLEAN DEFAULT 0,
+    catalan_description TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+  );
+  -- Energy insights and analytics
+  CREATE TABLE IF NOT EXISTS energy_insights (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT NOT NULL,
+    trend TEXT NOT NULL,
+    period TEXT NOT NULL,
+    confidence REAL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+  );
+  CREATE INDEX IF NOT EXISTS idx_optimization_insights_category ON optimization_insights(category);
+  CREATE INDEX IF NOT EXISTS idx_energy_insights_type ON energy_insights(type);
+`;
+
+// Explicit column lists for the read paths, in a fixed order
+const ENERGY_COLUMNS = `timestamp, production, consumption, grid_import, grid_export,
+  self_consumption_rate, autonomy_rate, created_at`;
+const DAILY_ENERGY_COLUMNS = `date, total_production, total_consumption, total_grid_import, total_grid_export,
+  peak_production, peak_consumption, self_consumption_rate, autonomy_rate,
+  efficiency_score, savings_euros, created_at`;
+const WEATHER_FORECAST_COLUMNS = `date, location, temperature_min, temperature_max, cloud_cover,
+  uv_index, solar_radiation, precipitation_probability, wind_speed,
+  weather_code, weather_description, expected_solar_production, forecast_created_at`;
+
+// Every table and index the schema defines
+const SCHEMA_OBJECTS = Array.from(
+  SCHEMA_SQL.matchAll(/CREATE (?:TABLE|INDEX) IF NOT EXISTS (\w+)/g),
+  match => match[1]!
+);
+
+// One open connection per database file, shared by every service in the process
+const sharedDatabases = new Map<string, DatabaseManager>();
+
 export class DatabaseManager {
   private db: sqlite3.Database;
   private dbPath: string;
+  private statements: Map<string, sqlite3.Statement> = new Map();
+  // Tail of the write queue; writes and batch transactions on this connection run one at a time
+  private writeQueue: Promise<void> = Promise.resolve();
+  // Schema setup; every query waits on it so none runs before the tables exist
+  private ready: Promise<void>;
 
-  constructor(dbPath: string = 'data/energy_data.db') {
+  constructor(dbPath: string = DEFAULT_DB_PATH) {
     this.dbPath = dbPath;
     this.ensureDirectoryExists();
     this.db = new sqlite3.Database(dbPath);
-    this.initializeTables();
+    this.configureConnection();
+    this.ready = this.initializeTables();
+  }
+
+  private configureConnection(): void {
+    // WAL lets readers run alongside writes; mmap and a larger page cache keep
+    // timestamp range scans over the energy table out of the read() path
+    this.db.serialize(() => {
+      this.db.run('PRAGMA journal_mode = WAL');
+      this.db.run('PRAGMA synchronous = NORMAL');
+      this.db.run('PRAGMA mmap_size = 268435456');
+      this.db.run('PRAGMA cache_size = -65536');
+      this.db.run('PRAGMA temp_store = MEMORY');
+    });
   }
 
   private ensureDirectoryExists(): void {
@@ -40,13 +214,39 @@ export class DatabaseManager {
   }
 
   private async initializeTables(): Promise<void> {
-    await this.createEnergyTables();
-    await this.createWeatherTables();
-    await this.createAutomationTables();
-    await this.createAnalyticsTables();
+    // Fast path: an existing database already has every table and index
+    const placeholders = SCHEMA_OBJECTS.map(() => '?').join(', ');
+    const row = await this.getRow(
+      `SELECT COUNT(*) AS count FROM sqlite_master WHERE name IN (${placeholders})`,
+      SCHEMA_OBJECTS
+    );
+    if (row?.count === SCHEMA_OBJECTS.length) return;
+
+    await this.exec(SCHEMA_SQL);
+  }
+
+  private async exec(sql: string): Promise<void> {
+    return new Promise((resolve, reject) => {
+      this.db.exec(sql, (err) => {
+        if (err) reject(err);
+        else resolve();
+      });
+    });
+  }
+
+  // Queue a write behind any transaction already open on this connection
+  private withWriteLock<T>(task: () => Promise<T>): Promise<T> {
+    const result = this.writeQueue.then(task);
+    this.writeQueue = result.then(() => undefined, () => undefined);
+    return result;
   }
 
   private async run(sql: string, params: any[] = []): Promise<any> {
+    await this.ready;
+    return this.withWriteLock(() => this.runUnlocked(sql, params));
+  }
+
+  private async runUnlocked(sql: string, params: any[] = []): Promise<any> {
     return new Promise((resolve, reject) => {
       this.db.run(sql, params, function(err) {
         if (err) reject(err);
@@ -56,6 +256,11 @@ export class DatabaseManager {
   }
 
   private async get(sql: string, params: any[] = []): Promise<any> {
+    await this.ready;
+    return this.getRow(sql, params);
+  }
+
+  private async getRow(sql: string, params: any[] = []): Promise<any> {
     return new Promise((resolve, reject) => {
       this.db.get(sql, params, (err, row) => {
         if (err) reject(err);
@@ -65,6 +270,7 @@ export class DatabaseManager {
   }
 
   private async all(sql: string, params: any[] = []): Promise<any[]> {
+    await this.ready;
     return new Promise((resolve, reject) => {
       this.db.all(sql, params, (err, rows) => {
         if (err) reject(err);
@@ -73,166 +279,121 @@ export class DatabaseManager {
     });
   }
 
-  private async createEnergyTables(): Promise<void> {
-    // Main energy production and consumption data (5-minute intervals)
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS energy (
-        timestamp TEXT PRIMARY KEY,
-        production REAL NOT NULL,
-        consumption REAL NOT NULL,
-        grid_import REAL DEFAULT 0,
-        grid_export REAL DEFAULT 0,
-        self_consumption_rate REAL,
-        autonomy_rate REAL,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-      )
-    `);
-
-    // Daily energy summaries
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS daily_energy (
-        date TEXT PRIMARY KEY,
-        total_production REAL NOT NULL,
-        total_consumption REAL NOT NULL,
-        total_grid_import REAL DEFAULT 0,
-        total_grid_export REAL DEFAULT 0,
-        peak_production REAL DEFAULT 0,
-        peak_consumption REAL DEFAULT 0,
-        self_consumption_rate REAL DEFAULT 0,
-        autonomy_rate REAL DEFAULT 0,
-        efficiency_score REAL DEFAULT 0,
-        savings_euros REAL DEFAULT 0,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-      )
-    `);
-
-    // Create indexes for performance
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_energy_timestamp ON energy(timestamp)`);
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_daily_energy_date ON daily_energy(date)`);
+  // Compile a statement, rejecting (instead of emitting an unhandled 'error') when it is invalid
+  private prepareStatement(sql: string): Promise<sqlite3.Statement> {
+    return new Promise((resolve, reject) => {
+      const statement = this.db.prepare(sql, (err: Error | null) => {
+        if (err) {
+          statement.finalize();
+          reject(err);
+        } else {
+          resolve(statement);
+        }
+      });
+    });
   }
 
-  private async createWeatherTables(): Promise<void> {
-    // Weather forecast data
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS weather_forecast (
-        date TEXT,
-        location TEXT,
-        temperature_min REAL,
-        temperature_max REAL,
-        cloud_cover REAL,
-        uv_index REAL,
-        solar_radiation REAL,
-        precipitation_probability REAL,
-        wind_speed REAL,
-        weather_code INTEGER,
-        weather_description TEXT,
-        expected_solar_production REAL,
-        forecast_created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        PRIMARY KEY (date, location)
-      )
-    `);
-
-    // Current weather data
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS weather_current (
-        timestamp TEXT,
-        location TEXT,
-        temperature REAL,
-        humidity REAL,
-        cloud_cover REAL,
-        uv_index REAL,
-        solar_radiation REAL,
-        wind_speed REAL,
-        precipitation REAL,
-        weather_description TEXT,
-        PRIMARY KEY (timestamp, location)
-      )
-    `);
-
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_weather_forecast_date ON weather_forecast(date)`);
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_weather_current_timestamp ON weather_current(timestamp)`);
+  // Prepared statements for hot queries, compiled once per connection and rebound on each call.
+  // Only statements that compiled are cached, so a failed prepare is retried on the next call.
+  private async prepare(sql: string): Promise<sqlite3.Statement> {
+    const cached = this.statements.get(sql);
+    if (cached) return cached;
+
+    const statement = await this.prepareStatement(sql);
+    const raced = this.statements.get(sql);
+    if (raced) {
+      // Another call compiled the same SQL meanwhile; keep that one
+      statement.finalize();
+      return raced;
+    }
+    this.statements.set(sql, statement);
+    return statement;
   }
 
-  private async createAutomationTables(): Promise<void> {
-    // Device registry
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS devices (
-        id TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        power_consumption REAL NOT NULL,
-        priority TEXT NOT NULL,
-        category TEXT NOT NULL,
-        status TEXT NOT NULL,
-        is_automated BOOLEAN DEFAULT 0,
-        description TEXT,
-        location TEXT,
-        manual_override BOOLEAN DEFAULT 0,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-      )
-    `);
-
-    // Automation events log
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS automation_events (
-        id TEXT PRIMARY KEY,
-        device_id TEXT NOT NULL,
-        event_type TEXT NOT NULL,
-        trigger_reason TEXT NOT NULL,
-        surplus_watts REAL NOT NULL,
-        timestamp TEXT NOT NULL,
-        success BOOLEAN NOT NULL,
-        error_message TEXT,
-        FOREIGN KEY (device_id) REFERENCES devices (id)
-      )
-    `);
+  private async runPrepared(sql: string, params: any[] = []): Promise<void> {
+    await this.ready;
+    const statement = await this.prepare(sql);
+    return this.withWriteLock(() => new Promise((resolve, reject) => {
+      statement.run(params, (err: Error | null) => {
+        if (err) reject(err);
+        else resolve();
+      });
+    }));
+  }
 
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_automation_events_device_id ON automation_events(device_id)`);
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_automation_events_timestamp ON automation_events(timestamp)`);
+  private async getPrepared(sql: string, params: any[] = []): Promise<any> {
+    await this.ready;
+    const statement = await this.prepare(sql);
+    return new Promise((resolve, reject) => {
+      statement.get(params, (err: Error | null, row: any) => {
+        // Reset so the finished read does not hold the statement open
+        statement.reset();
+        if (err) reject(err);
+        else resolve(row);
+      });
+    });
   }
 
-  private async createAnalyticsTables(): Promise<void> {
-    // Optimization insights
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS optimization_insights (
-        id TEXT PRIMARY KEY,
-        title TEXT NOT NULL,
-        description TEXT NOT NULL,
-        category TEXT NOT NULL,
-        priority TEXT NOT NULL,
-        potential_savings_kwh REAL DEFAULT 0,
-        potential_savings_euros REAL DEFAULT 0,
-        actionable BOOLEAN DEFAULT 1,
-        context TEXT,
-        is_elderly_friendly BOOLEAN DEFAULT 0,
-        catalan_description TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-      )
-    `);
+  private async allPrepared(sql: string, params: any[] = []): Promise<any[]> {
+    await this.ready;
+    const statement = await this.prepare(sql);
+    return new Promise((resolve, reject) => {
+      statement.all(params, (err: Error | null, rows: any[]) => {
+        if (err) reject(err);
+        else resolve(rows || []);
+      });
+    });
+  }
 
-    // Energy insights and analytics
-    await this.run(`
-      CREATE TABLE IF NOT EXISTS energy_insights (
-        id TEXT PRIMARY KEY,
-        type TEXT NOT NULL,
-        title TEXT NOT NULL,
-        description TEXT NOT NULL,
-        value REAL NOT NULL,
-        unit TEXT NOT NULL,
-        trend TEXT NOT NULL,
-        period TEXT NOT NULL,
-        confidence REAL DEFAULT 0,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-      )
-    `);
+  private async each(sql: string, params: any[], onRow: (row: any) => void): Promise<number> {
+    // Stream rows to the callback instead of materializing the full result set
+    await this.ready;
+    return new Promise((resolve, reject) => {
+      // Keep the first row error so a failed scan rejects instead of returning partial rows
+      let rowError: Error | null = null;
+      this.db.each(sql, params, (err, row) => {
+        if (err) {
+          if (!rowError) rowError = err;
+        } else if (!rowError) {
+          onRow(row);
+        }
+      }, (err, count) => {
+        if (err || rowError) reject(err || rowError);
+        else resolve(count);
+      });
+    });
+  }
 
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_optimization_insights_category ON optimization_insights(category)`);
-    await this.run(`CREATE INDEX IF NOT EXISTS idx_energy_insights_type ON energy_insights(type)`);
+  private async runBatch(sql: string, rows: any[][]): Promise<void> {
+    // One prepared statement inside one transaction: a single commit for the whole batch
+    if (rows.length === 0) return;
+    await this.ready;
+
+    // The connection is shared, so hold the write lock for the whole transaction
+    await this.withWriteLock(async () => {
+      await this.runUnlocked('BEGIN IMMEDIATE');
+      let statement: sqlite3.Statement | undefined;
+      try {
+        statement = await this.prepareStatement(sql);
+        for (const params of rows) {
+          await new Promise<void>((resolve, reject) => {
+            statement!.run(params, (err: Error | null) => err ? reject(err) : resolve());
+          });
+        }
+        await this.runUnlocked('COMMIT');
+      } catch (error) {
+        await this.runUnlocked('ROLLBACK');
+        throw error;
+      } finally {
+        // Release the statement whether the batch committed or rolled back
+        statement?.finalize();
+      }
+    });
   }
 
   // Energy data operations
   public async insertEnergyRecord(record: Omit<EnergyRecord, 'created_at'>): Promise<void> {
-    await this.run(`
+    await this.runPrepared(`
       INSERT OR REPLACE INTO energy (
         timestamp, production, consumption, grid_import, grid_export,
         self_consumption_rate, autonomy_rate
@@ -270,17 +431,90 @@ export class DatabaseManager {
     ]);
   }
 
+  public async rollupDailyEnergy(
+    days: Array<{ date: string; startTimestamp: string; endTimestamp: string }>
+  ): Promise<void> {
+    // Aggregate each day of raw samples in SQL; days without samples insert nothing
+    await this.runBatch(`
+      INSERT OR REPLACE INTO daily_energy (
+        date, total_production, total_consumption, total_grid_import, total_grid_export,
+        peak_production, peak_consumption, self_consumption_rate, autonomy_rate,
+        efficiency_score, savings_euros
+      )
+      SELECT
+        ?, production, consumption, grid_import, grid_export,
+        peak_production, peak_consumption, self_consumption_rate, autonomy_rate,
+        (self_consumption_rate + autonomy_rate) / 2,
+        (consumption - grid_import) / 1000.0 * 0.12
+      FROM (
+        SELECT
+          production, consumption, grid_import, grid_export, peak_production, peak_consumption,
+          CASE WHEN production > 0
+            THEN MIN(100, (production - grid_export) * 100.0 / production) ELSE 0 END AS self_consumption_rate,
+          CASE WHEN consumption > 0
+            THEN MIN(100, (consumption - grid_import) * 100.0 / consumption) ELSE 0 END AS autonomy_rate
+        FROM (
+          SELECT
+            SUM(production) AS production,
+            SUM(consumption) AS consumption,
+            SUM(grid_import) AS grid_import,
+            SUM(grid_export) AS grid_export,
+            MAX(production) AS peak_production,
+            MAX(consumption) AS peak_consumption
+          FROM energy
+          WHERE timestamp >= ? AND timestamp < ?
+          HAVING COUNT(*) > 0
+        )
+      )
+    `, days.map(day => [day.date, day.startTimestamp, day.endTimestamp]));
+  }
+
   public async getEnergyRecords(startDate: string, endDate: string): Promise<EnergyRecord[]> {
     return await this.all(`
-      SELECT * FROM energy 
+      SELECT ${ENERGY_COLUMNS} FROM energy
       WHERE timestamp BETWEEN ? AND ? 
       ORDER BY timestamp
     `, [startDate, endDate]);
   }
 
+  public async getHourlyEnergyTotals(startDate: string, endDate: string): Promise<HourlyEnergyTotals[]> {
+    // Aggregate inside SQLite so only one row per clock hour crosses into JS.
+    // Buckets are keyed on the ISO prefix (YYYY-MM-DDTHH) so no row is parsed as a date;
+    // the local hour is derived once per bucket instead.
+    const totals: HourlyEnergyTotals[] = [];
+    await this.each(`
+      SELECT
+        substr(timestamp, 1, 13) AS hour_key,
+        COUNT(*) AS samples,
+        SUM(production) AS production,
+        SUM(consumption) AS consumption,
+        SUM(grid_import) AS grid_import,
+        SUM(grid_export) AS grid_export
+      FROM energy
+      WHERE timestamp BETWEEN ? AND ?
+      GROUP BY hour_key
+    `, [startDate, endDate], row => {
+      totals.push({
+        hour: new Date(`${row.hour_key}:00:00Z`).getHours(),
+        samples: row.samples,
+        production: row.production,
+        consumption: row.consumption,
+        grid_import: row.grid_import,
+        grid_export: row.grid_export,
+      });
+    });
+
+    return totals;
+  }
+
+  public async getLatestEnergyTimestamp(): Promise<string | null> {
+    const row = await this.getPrepared('SELECT MAX(timestamp) AS latest FROM energy');
+    return row?.latest ?? null;
+  }
+
   public async getLatestEnergyRecord(): Promise<EnergyRecord | null> {
-    return await this.get(`
-      SELECT * FROM energy 
+    return await this.getPrepared(`
+      SELECT ${ENERGY_COLUMNS} FROM energy
       ORDER BY timestamp DESC 
       LIMIT 1
     `);
@@ -288,19 +522,31 @@ export class DatabaseManager {
 
   public async getDailyEnergyRecord(date: string): Promise<DailyEnergyRecord | null> {
     return await this.get(`
-      SELECT * FROM daily_energy WHERE date = ?
+      SELECT ${DAILY_ENERGY_COLUMNS} FROM daily_energy WHERE date = ?
     `, [date]);
   }
 
+  public async getDailyEnergyRecords(startDate: string, endDate: string): Promise<DailyEnergyRecord[]> {
+    return await this.allPrepared(`
+      SELECT ${DAILY_ENERGY_COLUMNS} FROM daily_energy
+      WHERE date BETWEEN ? AND ?
+      ORDER BY date
+    `, [startDate, endDate]);
+  }
+
   // Weather data operations
   public async insertWeatherForecast(forecast: Omit<WeatherForecast, 'forecast_created_at'>): Promise<void> {
-    await this.run(`
+    await this.insertWeatherForecasts([forecast]);
+  }
+
+  public async insertWeatherForecasts(forecasts: Array<Omit<WeatherForecast, 'forecast_created_at'>>): Promise<void> {
+    await this.runBatch(`
       INSERT OR REPLACE INTO weather_forecast (
         date, location, temperature_min, temperature_max, cloud_cover,
         uv_index, solar_radiation, precipitation_probability, wind_speed,
         weather_code, weather_description, expected_solar_production
       ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    `, [
+    `, forecasts.map(forecast => [
       forecast.date,
       forecast.location,
       forecast.temperature_min,
@@ -313,7 +559,7 @@ export class DatabaseManager {
       forecast.weather_code,
       forecast.weather_description,
       forecast.expected_solar_production
-    ]);
+    ]));
   }
 
   public async insertCurrentWeather(weather: WeatherData): Promise<void> {
@@ -337,8 +583,8 @@ export class DatabaseManager {
   }
 
   public async getWeatherForecast(location: string, days: number = 7): Promise<WeatherForecast[]> {
-    return await this.all(`
-      SELECT * FROM weather_forecast 
+    return await this.allPrepared(`
+      SELECT ${WEATHER_FORECAST_COLUMNS} FROM weather_forecast
       WHERE location = ? 
       ORDER BY date 
       LIMIT ?
@@ -375,6 +621,10 @@ export class DatabaseManager {
     }));
   }
 
+  public async deleteDevice(id: string): Promise<void> {
+    await this.run('DELETE FROM devices WHERE id = ?', [id]);
+  }
+
   public async getDevice(id: string): Promise<Device | null> {
     const row = await this.get('SELECT * FROM devices WHERE id = ?', [id]);
     if (!row) return null;
@@ -426,12 +676,16 @@ export class DatabaseManager {
 
   // Analytics operations
   public async insertOptimizationTip(tip: Omit<OptimizationTip, 'created_at'>): Promise<void> {
-    await this.run(`
+    await this.insertOptimizationTips([tip]);
+  }
+
+  public async insertOptimizationTips(tips: Array<Omit<OptimizationTip, 'created_at'>>): Promise<void> {
+    await this.runBatch(`
       INSERT OR REPLACE INTO optimization_insights (
         id, title, description, category, priority, potential_savings_kwh,
         potential_savings_euros, actionable, context, is_elderly_friendly, catalan_description
       ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    `, [
+    `, tips.map(tip => [
       tip.id,
       tip.title,
       tip.description,
@@ -443,7 +697,7 @@ export class DatabaseManager {
       tip.context,
       tip.is_elderly_friendly ? 1 : 0,
       tip.catalan_description
-    ]);
+    ]));
   }
 
   public async getOptimizationTips(category?: string, elderlyFriendly?: boolean): Promise<OptimizationTip[]> {
@@ -460,7 +714,7 @@ export class DatabaseManager {
       params.push(elderlyFriendly ? 1 : 0);
     }
 
-    query += ' ORDER BY priority DESC, created_at DESC';
+    query += " ORDER BY CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END, created_at DESC";
 
     const rows = await this.all(query, params);
     return rows.map(row => ({
@@ -487,6 +741,13 @@ export class DatabaseManager {
   }
 
   public close(): void {
+    if (sharedDatabases.get(this.dbPath) === this) {
+      sharedDatabases.delete(this.dbPath);
+    }
+    for (const statement of this.statements.values()) {
+      statement.finalize();
+    }
+    this.statements.clear();
     this.db.close();
   }
 }
@@ -496,4 +757,14 @@ export function createDatabase(dbPath?: string): DatabaseManager {
   return new DatabaseManager(dbPath);
 }
 
+// Get the shared connection for a database file, opening it on first use
+export function getDatabase(dbPath: string = DEFAULT_DB_PATH): DatabaseManager {
+  let database = sharedDatabases.get(dbPath);
+  if (!database) {
+    database = new DatabaseManager(dbPath);
+    sharedDatabases.set(dbPath, database);
+  }
+  return database;
+}
+
 export default DatabaseManager; 
\ No newline at end of file
@@ -26,16 +26,16 @@ export interface OptimizationTip {
 }
 
 export interface EnergyInsight {
-  id: string;
-  type: InsightType;
-  title: string;
-  description: string;
-  value: number;
-  unit: string;
-  trend: 'improving' | 'declining' | 'stable';
-  period: string;
-  confidence: number;
-  created_at: string;
+  readonly id: string;
+  readonly type: InsightType;
+  readonly title: string;
+  readonly description: string;
+  readonly value: number;
+  readonly unit: string;
+  readonly trend: 'improving' | 'declining' | 'stable';
+  readonly period: string;
+  readonly confidence: number;
+  readonly created_at: string;
 }
 
 export interface EfficiencyMetrics {
@@ -43,6 +43,17 @@ export interface DailyEnergyRecord {
   created_at: string;
 }
 
+export interface HourlyEnergyTotals {
+  /** Local hour of day (0-23); multi-day windows repeat each hour once per day */
+  hour: number;
+  /** Number of raw records folded into this bucket */
+  samples: number;
+  production: number;
+  consumption: number;
+  grid_import: number;
+  grid_export: number;
+}
+
 export interface EnergyStatus {
   current: PowerData;
   daily: DailyEnergyRecord;
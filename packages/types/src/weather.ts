@@ -35,24 +35,38 @@ export interface WeatherForecast {
   forecast_created_at: string;
 }
 
+export interface HourlyForecastPoint {
+  time: string;
+  hour: number;
+  irradiance: number;
+  cloudCover: number;
+  temperature: number;
+  uvIndex: number;
+  precipitation: number;
+  weatherCode: number;
+}
+
+export interface HourlyProductionAnalysis {
+  production_start: number;
+  production_end: number;
+  peak_hour: number;
+  optimal_windows: Array<{
+    start: number;
+    end: number;
+    description: string;
+  }>;
+  total_production_hours: number;
+  max_irradiance: number;
+  hourly_data?: HourlyForecastPoint[];
+}
+
 export interface SolarForecast {
   date: string;
   estimated_production_kwh: number;
   peak_production_hour: number;
   weather_factor: number;
   confidence_level: number;
-  hourly_analysis?: {
-    production_start: number;
-    production_end: number;
-    peak_hour: number;
-    optimal_windows: Array<{
-      start: number;
-      end: number;
-      description: string;
-    }>;
-    total_production_hours: number;
-    max_irradiance: number;
-  };
+  hourly_analysis?: HourlyProductionAnalysis;
 }
 
 export interface WeatherApiResponse {